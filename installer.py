@@ -5,85 +5,332 @@ Installs AlvinScan and all dependencies with a single script
 """
 
 import os
+import re
 import sys
+import importlib.util
 import subprocess
 import platform
 import shutil
-import urllib.request
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# User-space fallback copies use a 1 MiB buffer for anything beyond small files
+COPY_BUFSIZE = 1024 * 1024
+LARGE_FILE_THRESHOLD = 128 * 1024
+
+_copy_buffers = threading.local()
+
+# Checked once rather than for every copied file
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Distribution names whose import name differs from the normalised name
+IMPORT_NAMES = {
+    "Pillow": "PIL",
+    "python-dateutil": "dateutil",
+}
+
+# Launcher and uninstaller templates, filled in with str.format
+_WIN_SHORTCUT_TEMPLATE = '''@echo off
+cd /d "{install_dir}"
+"{python}" inventory_scanner.py
+pause
+'''
+
+_INFO_PLIST = '''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>CFBundleExecutable</key>
+    <string>AlvinScan</string>
+    <key>CFBundleName</key>
+    <string>AlvinScan</string>
+    <key>CFBundleIdentifier</key>
+    <string>com.alvinscan.inventory</string>
+    <key>CFBundleVersion</key>
+    <string>1.0</string>
+</dict>
+</plist>'''
+
+_MACOS_EXEC_TEMPLATE = '''#!/bin/bash
+cd "{install_dir}"
+"{python}" inventory_scanner.py
+'''
+
+_DESKTOP_TEMPLATE = '''[Desktop Entry]
+Name=AlvinScan
+Comment=Inventory Management System
+Exec={python} {install_dir}/inventory_scanner.py
+Icon=applications-inventory-management
+Terminal=false
+Type=Application
+Categories=Office;Utility;
+'''
+
+_WIN_UNINSTALL_TEMPLATE = '''@echo off
+echo Uninstalling AlvinScan...
+rmdir /s /q "{install_dir}"
+del "%USERPROFILE%\\Desktop\\AlvinScan.bat"
+del "%APPDATA%\\Microsoft\\Windows\\Start Menu\\Programs\\AlvinScan.bat"
+echo Uninstallation complete.
+pause
+'''
+
+_POSIX_UNINSTALL_TEMPLATE = '''#!/bin/bash
+echo "Uninstalling AlvinScan..."
+rm -rf "{install_dir}"
+rm -f "$HOME/Desktop/AlvinScan.desktop"
+rm -f "$HOME/Desktop/AlvinScan.app"
+rm -f "$HOME/.local/share/applications/AlvinScan.desktop"
+echo "Uninstallation complete."
+'''
+
+
+def _kernel_copy(src, dst):
+    """Copy file contents inside the kernel (copy_file_range, then sendfile)"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        remaining = os.fstat(in_fd).st_size
+        offset = 0
+
+        # copy_file_range can reflink on CoW filesystems and copy server-side on NFS
+        copy_file_range = getattr(os, "copy_file_range", None)
+        while copy_file_range and remaining > 0:
+            try:
+                sent = copy_file_range(in_fd, out_fd, remaining)
+            except OSError:
+                break  # e.g. EXDEV on older kernels; continue with sendfile
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+
+        while remaining > 0:
+            sent = os.sendfile(out_fd, in_fd, offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+
+
+def _buffered_copy(src, dst):
+    """Copy file contents through a reusable per-thread 1 MiB buffer"""
+    if os.path.getsize(src) <= LARGE_FILE_THRESHOLD:
+        shutil.copyfile(src, dst)
+        return
+
+    buf = getattr(_copy_buffers, "buf", None)
+    if buf is None:
+        buf = _copy_buffers.buf = bytearray(COPY_BUFSIZE)
+    view = memoryview(buf)
+
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            written = 0
+            while written < n:
+                written += fdst.write(view[written:n])
+
+
+def _fast_copy(src, dst, link=False):
+    """Copy a file and its metadata, avoiding user-space buffers where possible"""
+    src, dst = os.fspath(src), os.fspath(dst)
+
+    # Installing over the source tree itself: the file is already in place
+    if os.path.realpath(src) == os.path.realpath(dst):
+        return dst
+
+    # A previous linked install leaves dst as the same inode as src; writing
+    # through it would truncate the source, so drop the link first
+    if os.path.exists(dst) and (link or os.path.samefile(src, dst)):
+        os.unlink(dst)
+
+    if link:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass  # EXDEV, EPERM or no hard link support; copy instead
+
+    if _IS_WINDOWS:
+        try:
+            import ctypes
+            if ctypes.windll.kernel32.CopyFile2(src, dst, None) == 0:  # S_OK
+                shutil.copystat(src, dst)
+                return dst
+        except (AttributeError, OSError):
+            pass  # CopyFile2 needs Windows 8+
+    elif hasattr(os, "sendfile"):
+        try:
+            _kernel_copy(src, dst)
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass  # e.g. macOS only sends to sockets
+
+    _buffered_copy(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
 
 class AlvinScanInstaller:
     def __init__(self):
         self.system = platform.system()
+        self._is_win = self.system == "Windows"
+        self._is_mac = self.system == "Darwin"
+        self._is_linux = not (self._is_win or self._is_mac)
         self.python_cmd = sys.executable
-        self.install_dir = Path.home() / "AlvinScan"
-        self.desktop_dir = Path.home() / "Desktop"
+        self._home = Path.home()
+        self.install_dir = self._home / "AlvinScan"
+        self.desktop_dir = self._home / "Desktop"
+        # Hard-link instead of copying application files (--link), falling
+        # back to a copy across devices. Off by default: linked files share
+        # their data and mode with the source checkout, so editing an
+        # installed file also edits the original.
+        self.link_mode = False
+
+        # Status lines are buffered per thread and written once per step,
+        # since every console write is slow on Windows
+        self._out = threading.local()
+        self._out_lock = threading.Lock()
+
+        # Platform-specific steps; anything unrecognised is treated as Linux/Unix
+        self._shortcut_handlers = {
+            "Windows": self._shortcut_windows,
+            "Darwin": self._shortcut_macos,
+            "Linux": self._shortcut_linux,
+        }
+        self._uninstaller_handlers = {
+            "Windows": self._uninstaller_windows,
+        }
         
+    def _emit(self, message):
+        """Queue a status line for the current step"""
+        buf = getattr(self._out, "buf", None)
+        if buf is None:
+            buf = self._out.buf = []
+        buf.append(message)
+
+    def _flush(self):
+        """Write this thread's queued status lines in one go"""
+        buf = getattr(self._out, "buf", None)
+        if not buf:
+            return
+        with self._out_lock:
+            sys.stdout.write("\n".join(buf) + "\n")
+            sys.stdout.flush()
+        buf.clear()
+    
     def print_banner(self):
         """Print installation banner"""
-        print("=" * 60)
-        print("AlvinScan Inventory Management System")
-        print("Comprehensive Installer")
-        print(f"System: {self.system}")
-        print(f"Python: {sys.version}")
-        print("=" * 60)
-        print()
+        self._emit("=" * 60)
+        self._emit("AlvinScan Inventory Management System")
+        self._emit("Comprehensive Installer")
+        self._emit(f"System: {self.system}")
+        self._emit(f"Python: {sys.version}")
+        self._emit("=" * 60)
+        self._emit("")
     
     def check_python_version(self):
         """Ensure Python 3.7+ is installed"""
         if sys.version_info < (3, 7):
-            print("ERROR: Python 3.7 or higher is required")
-            print(f"Current version: {sys.version}")
+            self._emit("ERROR: Python 3.7 or higher is required")
+            self._emit(f"Current version: {sys.version}")
             return False
-        print("✓ Python version OK")
+        self._emit("✓ Python version OK")
         return True
     
     def install_pip_packages(self):
         """Install required Python packages"""
-        print("\nInstalling Python packages...")
-        packages = [
-            "tk",  # Usually comes with Python
-            "Pillow",  # For image handling
-            "pyperclip",  # For clipboard operations
-            "python-dateutil",  # For date handling
+        self._emit("\nInstalling Python packages...")
+        requirements_file = Path(__file__).parent / "requirements.txt"
+        if not requirements_file.exists():
+            self._emit("⚠ Warning: requirements.txt not found, skipping packages")
+            return True
+
+        # Only hand pip the packages that are not importable already
+        missing = []
+        for package in self.read_requirements(requirements_file):
+            if importlib.util.find_spec(self.import_name(package)) is None:
+                missing.append(package)
+            else:
+                self._emit(f"✓ {package} already satisfied")
+        if not missing:
+            return True
+
+        pip_cmd = [
+            self.python_cmd, "-m", "pip", "install", "--upgrade", "-q",
+            "--disable-pip-version-check", "--no-input", "--prefer-binary",
         ]
-        
-        for package in packages:
-            try:
-                print(f"Installing {package}...")
-                subprocess.check_call([
-                    self.python_cmd, "-m", "pip", "install", "--upgrade", package
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                print(f"✓ {package} installed")
-            except subprocess.CalledProcessError:
-                print(f"✗ Failed to install {package}")
+
+        # Keep downloaded wheels next to the install so re-runs skip the network
+        env = os.environ.copy()
+        env["PIP_CACHE_DIR"] = str(self.install_dir / ".pip-cache")
+
+        def run_pip(args):
+            # Output is captured and only shown when the final attempt fails
+            return subprocess.run(pip_cmd + args, env=env, capture_output=True, text=True)
+
+        # One pip run resolves and downloads everything together. Wheels only
+        # on the first try so nothing is compiled from source
+        self._emit(f"Installing {', '.join(missing)}...")
+        for extra_args in (["--only-binary=:all:"], []):
+            if run_pip(extra_args + missing).returncode == 0:
+                self._emit("✓ Packages installed")
+                return True
+            if extra_args:
+                self._emit("⚠ No prebuilt wheels for some packages, allowing source builds")
+        self._emit("⚠ Combined install failed, retrying packages individually")
+
+        # Fall back to one package at a time to report which one fails
+        for package in missing:
+            self._emit(f"Installing {package}...")
+            result = run_pip([package])
+            if result.returncode != 0:
+                self._emit(f"✗ Failed to install {package}")
+                self._emit(result.stdout.strip())
+                self._emit(result.stderr.strip())
                 return False
-        
+            self._emit(f"✓ {package} installed")
+
         return True
+
+    @staticmethod
+    def read_requirements(requirements_file: Path) -> list:
+        """Return the requirement specifiers listed in a requirements file"""
+        packages = []
+        for line in requirements_file.read_text().splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                packages.append(line)
+        return packages
+
+    @staticmethod
+    def import_name(requirement: str) -> str:
+        """Map a requirement specifier to the module it installs"""
+        name = re.split(r"[\s\[<>=!~;]", requirement, 1)[0]
+        return IMPORT_NAMES.get(name, name.lower().replace("-", "_"))
     
     def create_directories(self):
         """Create necessary directories"""
-        print("\nCreating directories...")
-        
-        dirs = [
-            self.install_dir,
-            self.install_dir / "data",
-            self.install_dir / "exports",
-            self.install_dir / "backups",
-            self.install_dir / "logs",
-        ]
-        
-        for dir_path in dirs:
-            dir_path.mkdir(parents=True, exist_ok=True)
-            print(f"✓ Created {dir_path}")
+        self._emit("\nCreating directories...")
         
+        # Only the root needs parents=True; the subdirectories hang off it
+        self.install_dir.mkdir(parents=True, exist_ok=True)
+        created = [self.install_dir]
+        for sub in ("data", "exports", "backups", "logs", ".pip-cache"):
+            dir_path = self.install_dir / sub
+            dir_path.mkdir(exist_ok=True)
+            created.append(dir_path)
+
+        self._emit("\n".join(f"✓ Created {dir_path}" for dir_path in created))
         return True
     
     def copy_application_files(self):
         """Copy application files to installation directory"""
-        print("\nCopying application files...")
+        self._emit("\nCopying application files...")
         
         # Get the directory where installer.py is located
         source_dir = Path(__file__).parent
@@ -98,201 +345,212 @@ class AlvinScanInstaller:
             "MANUAL_PUSH_INSTRUCTIONS.md",
         ]
         
+        # One directory listing answers every "does it exist" question
+        with os.scandir(source_dir) as it:
+            entries = {entry.name: entry for entry in it if entry.is_file()}
+
+        copies = []
         for file_name in files_to_copy:
-            source_file = source_dir / file_name
-            if source_file.exists():
-                dest_file = self.install_dir / file_name
-                shutil.copy2(source_file, dest_file)
-                print(f"✓ Copied {file_name}")
+            entry = entries.get(file_name)
+            if entry is not None:
+                copies.append((file_name, entry.path, self.install_dir / file_name))
             else:
-                print(f"⚠ Warning: {file_name} not found in source directory")
-        
+                self._emit(f"⚠ Warning: {file_name} not found in source directory")
+
+        link = self.link_mode
+        if link:
+            self._emit("Hard-linking files where the filesystem allows it")
+
+        # Copies are independent and I/O bound, so overlap them
+        def copy_one(copy):
+            try:
+                _fast_copy(copy[1], copy[2], link)
+                return None
+            except OSError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            errors = list(executor.map(copy_one, copies))
+
+        failed = False
+        for (file_name, _, _), error in zip(copies, errors):
+            if error is None:
+                self._emit(f"✓ Copied {file_name}")
+            else:
+                self._emit(f"✗ Failed to copy {file_name}: {error}")
+                failed = True
+        if failed:
+            return False
+
         # Copy batch/shell scripts
-        if self.system == "Windows":
-            script_file = source_dir / "run_scanner.bat"
-            if script_file.exists():
-                shutil.copy2(script_file, self.install_dir / "run_scanner.bat")
-        else:
-            script_file = source_dir / "run_scanner.sh"
-            if script_file.exists():
-                shutil.copy2(script_file, self.install_dir / "run_scanner.sh")
-                # Make it executable
-                os.chmod(self.install_dir / "run_scanner.sh", 0o755)
+        script_name = "run_scanner.bat" if self._is_win else "run_scanner.sh"
+        script_entry = entries.get(script_name)
+        if script_entry is not None:
+            script_dest = self.install_dir / script_name
+            _fast_copy(script_entry.path, script_dest, link)
+            # Make it executable, unless it is linked to the checkout's script
+            if not self._is_win and not os.path.samefile(script_entry.path, script_dest):
+                script_dest.chmod(0o755)
         
         return True
     
     def create_desktop_shortcuts(self):
         """Create desktop shortcuts"""
-        print("\nCreating desktop shortcuts...")
-        
-        if self.system == "Windows":
-            # Create Windows batch file for desktop
-            shortcut_content = f'''@echo off
-cd /d "{self.install_dir}"
-"{self.python_cmd}" inventory_scanner.py
-pause
-'''
-            shortcut_path = self.desktop_dir / "AlvinScan.bat"
-            with open(shortcut_path, 'w') as f:
-                f.write(shortcut_content)
-            print(f"✓ Created desktop shortcut: {shortcut_path}")
-            
-            # Create Start Menu shortcut
-            start_menu = Path.home() / "AppData" / "Roaming" / "Microsoft" / "Windows" / "Start Menu" / "Programs"
-            if start_menu.exists():
-                shutil.copy2(shortcut_path, start_menu / "AlvinScan.bat")
-                print("✓ Created Start Menu shortcut")
-        
-        elif self.system == "Darwin":  # macOS
-            # Create macOS app bundle
-            app_path = self.desktop_dir / "AlvinScan.app"
-            contents_path = app_path / "Contents"
-            macos_path = contents_path / "MacOS"
-            
-            # Create directory structure
-            macos_path.mkdir(parents=True, exist_ok=True)
-            
-            # Create Info.plist
-            info_plist = '''<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>CFBundleExecutable</key>
-    <string>AlvinScan</string>
-    <key>CFBundleName</key>
-    <string>AlvinScan</string>
-    <key>CFBundleIdentifier</key>
-    <string>com.alvinscan.inventory</string>
-    <key>CFBundleVersion</key>
-    <string>1.0</string>
-</dict>
-</plist>'''
-            with open(contents_path / "Info.plist", 'w') as f:
-                f.write(info_plist)
-            
-            # Create executable script
-            exec_script = f'''#!/bin/bash
-cd "{self.install_dir}"
-"{self.python_cmd}" inventory_scanner.py
-'''
-            exec_path = macos_path / "AlvinScan"
-            with open(exec_path, 'w') as f:
-                f.write(exec_script)
-            os.chmod(exec_path, 0o755)
-            
-            print(f"✓ Created macOS app: {app_path}")
-        
-        else:  # Linux
-            # Create .desktop file
-            desktop_content = f'''[Desktop Entry]
-Name=AlvinScan
-Comment=Inventory Management System
-Exec={self.python_cmd} {self.install_dir}/inventory_scanner.py
-Icon=applications-inventory-management
-Terminal=false
-Type=Application
-Categories=Office;Utility;
-'''
-            desktop_path = self.desktop_dir / "AlvinScan.desktop"
-            with open(desktop_path, 'w') as f:
-                f.write(desktop_content)
-            os.chmod(desktop_path, 0o755)
-            print(f"✓ Created desktop shortcut: {desktop_path}")
-            
-            # Copy to applications menu
-            apps_dir = Path.home() / ".local" / "share" / "applications"
-            if apps_dir.exists():
-                shutil.copy2(desktop_path, apps_dir / "AlvinScan.desktop")
-                print("✓ Added to applications menu")
-        
+        self._emit("\nCreating desktop shortcuts...")
+        self._shortcut_handlers.get(self.system, self._shortcut_linux)()
         return True
-    
+
+    def _shortcut_windows(self):
+        """Create the desktop batch file and Start Menu entry on Windows"""
+        shortcut_content = _WIN_SHORTCUT_TEMPLATE.format(
+            install_dir=self.install_dir, python=self.python_cmd)
+        shortcut_path = self.desktop_dir / "AlvinScan.bat"
+        shortcut_path.write_text(shortcut_content)
+        self._emit(f"✓ Created desktop shortcut: {shortcut_path}")
+
+        # Create Start Menu shortcut
+        start_menu = self._home / "AppData" / "Roaming" / "Microsoft" / "Windows" / "Start Menu" / "Programs"
+        if start_menu.exists():
+            shutil.copy2(shortcut_path, start_menu / "AlvinScan.bat")
+            self._emit("✓ Created Start Menu shortcut")
+
+    def _shortcut_macos(self):
+        """Create an app bundle on the macOS desktop"""
+        app_path = self.desktop_dir / "AlvinScan.app"
+        contents_path = app_path / "Contents"
+        macos_path = contents_path / "MacOS"
+
+        # Create directory structure
+        macos_path.mkdir(parents=True, exist_ok=True)
+
+        # Create Info.plist
+        (contents_path / "Info.plist").write_text(_INFO_PLIST, encoding='utf-8')
+
+        # Create executable script
+        exec_script = _MACOS_EXEC_TEMPLATE.format(
+            install_dir=self.install_dir, python=self.python_cmd)
+        exec_path = macos_path / "AlvinScan"
+        exec_path.write_text(exec_script, encoding='utf-8')
+        exec_path.chmod(0o755)
+
+        self._emit(f"✓ Created macOS app: {app_path}")
+
+    def _shortcut_linux(self):
+        """Create a .desktop launcher on Linux and other Unix desktops"""
+        desktop_content = _DESKTOP_TEMPLATE.format(
+            install_dir=self.install_dir, python=self.python_cmd)
+        desktop_path = self.desktop_dir / "AlvinScan.desktop"
+        desktop_path.write_text(desktop_content, encoding='utf-8')
+        desktop_path.chmod(0o755)
+        self._emit(f"✓ Created desktop shortcut: {desktop_path}")
+
+        # Copy to applications menu
+        apps_dir = self._home / ".local" / "share" / "applications"
+        if apps_dir.exists():
+            shutil.copy2(desktop_path, apps_dir / "AlvinScan.desktop")
+            self._emit("✓ Added to applications menu")
+
     def create_uninstaller(self):
         """Create uninstaller script"""
-        print("\nCreating uninstaller...")
-        
-        if self.system == "Windows":
-            uninstaller_content = f'''@echo off
-echo Uninstalling AlvinScan...
-rmdir /s /q "{self.install_dir}"
-del "%USERPROFILE%\\Desktop\\AlvinScan.bat"
-del "%APPDATA%\\Microsoft\\Windows\\Start Menu\\Programs\\AlvinScan.bat"
-echo Uninstallation complete.
-pause
-'''
-            uninstaller_path = self.install_dir / "uninstall.bat"
-        else:
-            uninstaller_content = f'''#!/bin/bash
-echo "Uninstalling AlvinScan..."
-rm -rf "{self.install_dir}"
-rm -f "$HOME/Desktop/AlvinScan.desktop"
-rm -f "$HOME/Desktop/AlvinScan.app"
-rm -f "$HOME/.local/share/applications/AlvinScan.desktop"
-echo "Uninstallation complete."
-'''
-            uninstaller_path = self.install_dir / "uninstall.sh"
-        
-        with open(uninstaller_path, 'w') as f:
-            f.write(uninstaller_content)
-        
-        if self.system != "Windows":
-            os.chmod(uninstaller_path, 0o755)
-        
-        print(f"✓ Created uninstaller: {uninstaller_path}")
+        self._emit("\nCreating uninstaller...")
+        uninstaller_path = self._uninstaller_handlers.get(self.system, self._uninstaller_posix)()
+        self._emit(f"✓ Created uninstaller: {uninstaller_path}")
         return True
+
+    def _uninstaller_windows(self) -> Path:
+        """Write uninstall.bat and return its path"""
+        uninstaller_content = _WIN_UNINSTALL_TEMPLATE.format(install_dir=self.install_dir)
+        uninstaller_path = self.install_dir / "uninstall.bat"
+        uninstaller_path.write_text(uninstaller_content)
+        return uninstaller_path
+
+    def _uninstaller_posix(self) -> Path:
+        """Write an executable uninstall.sh and return its path"""
+        uninstaller_content = _POSIX_UNINSTALL_TEMPLATE.format(install_dir=self.install_dir)
+        uninstaller_path = self.install_dir / "uninstall.sh"
+        uninstaller_path.write_text(uninstaller_content, encoding='utf-8')
+        uninstaller_path.chmod(0o755)
+        return uninstaller_path
     
     def test_installation(self):
         """Test the installation"""
-        print("\nTesting installation...")
+        self._emit("\nTesting installation...")
         
+        # Run the check in a child interpreter so tkinter, sqlite3 and the
+        # install dir on sys.path don't stay loaded in the installer
+        test_db_path = self.install_dir / "data" / "test.db"
+        check_script = (
+            "import sys; sys.path.insert(0, sys.argv[1]); "
+            "import inventory_scanner as m; "
+            "print('✓ Main application module loads correctly'); "
+            "db = m.InventoryDatabase(sys.argv[2]); db.close()"
+        )
+
+        # The child writes straight to the console, so get ours out first
+        self._flush()
         try:
-            # Test importing the main module
-            sys.path.insert(0, str(self.install_dir))
-            import inventory_scanner
-            print("✓ Main application module loads correctly")
-            
-            # Test database creation
-            test_db_path = self.install_dir / "data" / "test.db"
-            test_db = inventory_scanner.InventoryDatabase(str(test_db_path))
-            test_db.close()
+            subprocess.run(
+                [self.python_cmd, "-c", check_script, str(self.install_dir), str(test_db_path)],
+                cwd=str(self.install_dir), check=True, timeout=30,
+            )
             
             if test_db_path.exists():
                 test_db_path.unlink()  # Remove test database
-                print("✓ Database creation works")
+                self._emit("✓ Database creation works")
             
             return True
-        except Exception as e:
-            print(f"✗ Installation test failed: {e}")
+        except (subprocess.SubprocessError, OSError) as e:
+            self._emit(f"✗ Installation test failed: {e}")
             return False
     
+    def run_step(self, step_name, step_func):
+        """Run one installation step, reporting a failure by name"""
+        self._emit(f"\n{step_name}...")
+        try:
+            if not step_func():
+                self._emit(f"\n✗ Installation failed at: {step_name}")
+                return False
+            return True
+        finally:
+            self._flush()
+
     def install(self):
         """Run the complete installation process"""
         self.print_banner()
+        self._flush()
         
+        if not self.run_step("Checking Python version", self.check_python_version):
+            return False
+
+        # pip is network bound and independent of the install tree, so it runs
+        # while the directories are created and the files copied
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            packages = executor.submit(
+                self.run_step, "Installing Python packages", self.install_pip_packages)
+            files_ok = (self.run_step("Creating directories", self.create_directories)
+                        and self.run_step("Copying application files", self.copy_application_files))
+            if not (packages.result() and files_ok):
+                return False
+
         steps = [
-            ("Checking Python version", self.check_python_version),
-            ("Installing Python packages", self.install_pip_packages),
-            ("Creating directories", self.create_directories),
-            ("Copying application files", self.copy_application_files),
             ("Creating desktop shortcuts", self.create_desktop_shortcuts),
             ("Creating uninstaller", self.create_uninstaller),
             ("Testing installation", self.test_installation),
         ]
         
         for step_name, step_func in steps:
-            print(f"\n{step_name}...")
-            if not step_func():
-                print(f"\n✗ Installation failed at: {step_name}")
+            if not self.run_step(step_name, step_func):
                 return False
         
-        print("\n" + "=" * 60)
-        print("✓ Installation completed successfully!")
-        print(f"✓ AlvinScan installed to: {self.install_dir}")
-        print("✓ Desktop shortcut created")
-        print("\nYou can now run AlvinScan from:")
-        print(f"  - Desktop shortcut")
-        print(f"  - {self.install_dir}")
-        print("=" * 60)
+        self._emit("\n" + "=" * 60)
+        self._emit("✓ Installation completed successfully!")
+        self._emit(f"✓ AlvinScan installed to: {self.install_dir}")
+        self._emit("✓ Desktop shortcut created")
+        self._emit("\nYou can now run AlvinScan from:")
+        self._emit(f"  - Desktop shortcut")
+        self._emit(f"  - {self.install_dir}")
+        self._emit("=" * 60)
+        self._flush()
         
         return True
 
@@ -300,9 +558,10 @@ echo "Uninstallation complete."
 def main():
     """Main entry point"""
     installer = AlvinScanInstaller()
+    installer.link_mode = "--link" in sys.argv[1:]
     
     # Check if running with admin/sudo privileges (recommended)
-    if platform.system() == "Windows":
+    if installer._is_win:
         import ctypes
         if not ctypes.windll.shell32.IsUserAnAdmin():
             print("⚠ Warning: Running without administrator privileges")
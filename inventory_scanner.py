@@ -9,18 +9,35 @@ from tkinter import ttk, messagebox, filedialog
 import json
 import os
 from datetime import datetime
+from html import unescape
 from pathlib import Path
 import sqlite3
 from dataclasses import dataclass, asdict
+from contextlib import contextmanager
 from typing import Dict, List, Optional
 import uuid
+import operator
 import platform
+import re
 import subprocess
+import sys
+import http.client
+import urllib.error
 import urllib.request
 import urllib.parse
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from sync_utility import InventorySync
 
+try:
+    # Optional C decoder for additional_info; values are still written with
+    # the stdlib encoder so stored JSON looks the same on every station
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 # Default API Configuration
 DEFAULT_CONFIG = {
     "apis": [
@@ -44,6 +61,188 @@ DEFAULT_CONFIG = {
     ]
 }
 
+# Stored in PRAGMA user_version once init_database has brought a database up
+# to date; bump it whenever init_database changes the schema
+SCHEMA_VERSION = 1
+
+# Items schema; the defaults fill in everything but the UPC for new scans
+ITEMS_TABLE_SQL = '''
+    CREATE TABLE {if_not_exists} {name} (
+        upc TEXT PRIMARY KEY,
+        description TEXT DEFAULT '',
+        additional_info TEXT NOT NULL DEFAULT '{{}}',
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+        updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+    )
+'''
+
+# Statements used by InventoryDatabase; kept as constants so every call
+# binds the identical string and hits the connection's statement cache
+SQL_INSERT_ITEM = 'INSERT OR IGNORE INTO items (upc) VALUES (?)'
+
+SQL_UPSERT_ITEM = '''
+    INSERT INTO items (upc, description, additional_info, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(upc) DO UPDATE SET
+        description = COALESCE(excluded.description, description),
+        additional_info = excluded.additional_info,
+        updated_at = excluded.updated_at
+'''
+
+SQL_UPDATE_DESCRIPTION = 'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?'
+SQL_UPDATE_INFO = 'UPDATE items SET additional_info = ?, updated_at = ? WHERE upc = ?'
+SQL_UPDATE_IDENTIFICATION = 'UPDATE items SET description = ?, additional_info = ?, updated_at = ? WHERE upc = ?'
+
+SQL_UPSERT_ATTRIBUTE = '''
+    INSERT INTO item_attributes (upc, key, value) VALUES (?, ?, ?)
+    ON CONFLICT(upc, key) DO UPDATE SET value = excluded.value
+'''
+
+SQL_INSERT_LOCATION = '''
+    INSERT INTO locations (uuid, name, description, created_at)
+    VALUES (?, ?, ?, ?)
+'''
+
+# Inventory rows as shown in the main list; callers append the WHERE clause
+SQL_INVENTORY_ROWS = '''
+    SELECT i.upc, i.description, i.additional_info, inv.quantity, inv.last_scanned,
+           replace(substr(inv.last_scanned, 1, 16), 'T', ' ') AS last_scanned_fmt
+    FROM inventory inv
+    JOIN items i ON inv.item_upc = i.upc
+'''
+
+SQL_LOCATION_SUMMARY = '''
+    SELECT l.id, l.name, COALESCE(s.item_count, 0) AS item_count, COALESCE(s.total_qty, 0) AS total_qty
+    FROM locations l
+    LEFT JOIN location_summary s ON l.id = s.location_id
+    ORDER BY l.name
+'''
+
+SQL_ITEM_LOCATIONS = '''
+    SELECT l.*, inv.quantity, inv.last_scanned
+    FROM inventory inv
+    JOIN locations l ON inv.location_id = l.id
+    WHERE inv.item_upc = ?
+    ORDER BY inv.quantity DESC
+'''
+
+SQL_UPSERT_INV = '''
+    INSERT INTO inventory (item_upc, location_id, quantity, last_scanned)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(item_upc, location_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        last_scanned = excluded.last_scanned
+'''
+
+SQL_INSERT_HISTORY = '''
+    INSERT INTO scan_history (item_upc, location_id, action, quantity_change, scanned_at, workstation_id)
+    VALUES '''
+HISTORY_ROW = "(?, ?, 'scan', ?, ?, ?)"
+# Rows per multi-row history insert; 5 variables each stays under the
+# 999-variable limit of older SQLite builds
+HISTORY_ROWS_PER_INSERT = 199
+
+_history_insert_sql: Dict[int, str] = {}
+
+
+def history_insert_sql(rows: int) -> str:
+    """Return (and cache) a scan_history INSERT with the given number of VALUES rows"""
+    sql = _history_insert_sql.get(rows)
+    if sql is None:
+        sql = _history_insert_sql[rows] = SQL_INSERT_HISTORY + ",".join([HISTORY_ROW] * rows)
+    return sql
+
+
+# Check digit weights for EAN-8/UPC-A/EAN-13, applied right to left
+# starting next to the check digit
+GTIN_WEIGHTS = (3, 1) * 6
+
+# Patterns for scraping search results and pages, compiled once
+DDG_RESULT_RE = re.compile(r'<a rel="nofollow" class="result__a" href="([^"]+)"[^>]*>([^<]+)</a>')
+# Each text run can only be matched one way, so a snippet without its
+# closing </a> fails in linear time instead of backtracking
+DDG_SNIPPET_RE = re.compile(r'<a class="result__snippet"[^>]*>([^<]+(?:<[^>]+>[^<]*</[^>]+>[^<]*)*)</a>')
+TITLE_RE = re.compile(r'<title[^>]*>([^<]+)</title>', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+# Script and style blocks with their contents, or any other tag
+PAGE_MARKUP_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>|<[^>]+>', re.DOTALL | re.IGNORECASE)
+
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+# Sent when the caller gives none, as urllib did
+DEFAULT_USER_AGENT = f'Python-urllib/{sys.version_info[0]}.{sys.version_info[1]}'
+HTTP_MAX_REDIRECTS = 5
+# Most of a page fetch_page_text reads; its title and opening text come first
+PAGE_FETCH_LIMIT = 256 * 1024
+
+# Kept-alive connections by (scheme, host), separate for each thread
+_http_local = threading.local()
+
+# Runs the enabled APIs' lookups side by side. Its threads live on, so
+# each keeps its connections open for the next scan
+LOOKUP_WORKERS = 8
+_lookup_pool = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix='lookup')
+
+# Lookups kept for re-scans as (expires, result), keyed by (code, API settings
+# as JSON) so editing an API's settings never returns its old answers. Finds
+# are kept for the session; misses (which include network errors) only for
+# LOOKUP_MISS_TTL seconds, long enough to skip a retyped part number
+LOOKUP_CACHE_SIZE = 1024
+LOOKUP_MISS_TTL = 120
+_lookup_cache: Dict[tuple, tuple] = OrderedDict()
+_lookup_cache_lock = threading.Lock()
+
+
+def http_get(url: str, headers: Dict[str, str] = None, timeout: float = 10, max_bytes: int = None) -> bytes:
+    """GET url and return the body (at most max_bytes of it), reusing this thread's open connection to the host"""
+    headers = dict(headers or {})
+    headers.setdefault('User-Agent', DEFAULT_USER_AGENT)
+    for _ in range(HTTP_MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or parts.scheme in urllib.request.getproxies():
+            # Proxied and other URLs go through urllib, which handles them
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                return response.read(max_bytes)
+        path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        response = _http_request(parts.scheme, parts.netloc, path, headers, timeout)
+        body = response.read(max_bytes)
+        if not response.isclosed():
+            # Cut short; the rest of the body is still on the wire, so the
+            # connection can't carry another request
+            _http_local.connections.pop((parts.scheme, parts.netloc)).close()
+        location = response.getheader('Location')
+        if response.status in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            continue
+        if response.status >= 400:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+        return body
+    raise urllib.error.URLError(f"Too many redirects for {url}")
+
+
+def _http_request(scheme: str, netloc: str, path: str, headers: Dict[str, str], timeout: float):
+    """Send a GET on the cached connection to scheme://netloc, reconnecting once if it has gone stale"""
+    connections = getattr(_http_local, 'connections', None)
+    if connections is None:
+        connections = _http_local.connections = {}
+    key = (scheme, netloc)
+    for attempt in range(2):
+        conn = connections.get(key)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            conn = connections[key] = conn_class(netloc, timeout=timeout)
+        elif conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request('GET', path, headers=headers)
+            return conn.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # The server closed an idle keep-alive connection
+            conn.close()
+            del connections[key]
+            if attempt:
+                raise
+
 
 class ConfigManager:
     """Manages application configuration"""
@@ -54,6 +253,9 @@ class ConfigManager:
             config_path = script_dir / "config.json"
         self.config_path = Path(config_path)
         self.config = self.load_config()
+        # Enabled APIs, rebuilt after the config changes; every change goes
+        # through save_config, including in-place edits from API Settings
+        self._enabled_apis: Optional[List[dict]] = None
 
     def load_config(self) -> dict:
         """Load config from file or create default"""
@@ -67,6 +269,7 @@ class ConfigManager:
 
     def save_config(self):
         """Save config to file"""
+        self._enabled_apis = None
         try:
             with open(self.config_path, 'w') as f:
                 json.dump(self.config, f, indent=2)
@@ -78,8 +281,11 @@ class ConfigManager:
         return self.config.get('apis', [])
 
     def get_enabled_apis(self) -> List[dict]:
-        """Get list of enabled APIs"""
-        return [api for api in self.get_apis() if api.get('enabled', True)]
+        """Get list of enabled APIs (shared; don't modify it)"""
+        enabled = self._enabled_apis
+        if enabled is None:
+            enabled = self._enabled_apis = [api for api in self.get_apis() if api.get('enabled', True)]
+        return enabled
 
     def add_api(self, api_config: dict):
         """Add a new API configuration"""
@@ -115,38 +321,28 @@ class WebSearcher:
             encoded_query = urllib.parse.quote(f"{query} auto parts")
             url = f"https://html.duckduckgo.com/html/?q={encoded_query}"
 
-            req = urllib.request.Request(url)
-            req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-
-            with urllib.request.urlopen(req, timeout=15) as response:
-                html = response.read().decode('utf-8', errors='ignore')
+            headers = {'User-Agent': BROWSER_USER_AGENT}
 
-                # Simple parsing of DuckDuckGo HTML results
-                import re
+            html = http_get(url, headers, timeout=15).decode('utf-8', errors='ignore')
 
-                # Find result blocks
-                result_pattern = r'<a rel="nofollow" class="result__a" href="([^"]+)"[^>]*>([^<]+)</a>'
-                snippet_pattern = r'<a class="result__snippet"[^>]*>([^<]+(?:<[^>]+>[^<]*</[^>]+>)*[^<]*)</a>'
+            # Simple parsing of DuckDuckGo HTML results
+            links = DDG_RESULT_RE.findall(html)
+            snippets = DDG_SNIPPET_RE.findall(html)
 
-                links = re.findall(result_pattern, html)
-                snippets = re.findall(snippet_pattern, html)
+            for i, (link, title) in enumerate(links[:max_results]):
+                # Unwrap DuckDuckGo's redirect link to the result's own URL
+                link = unescape(link)
+                actual_url = urllib.parse.parse_qs(urllib.parse.urlsplit(link).query).get('uddg', [link])[0]
 
-                for i, (link, title) in enumerate(links[:max_results]):
-                    # Clean up the redirect URL
-                    if 'uddg=' in link:
-                        actual_url = urllib.parse.unquote(link.split('uddg=')[1].split('&')[0])
-                    else:
-                        actual_url = link
+                snippet = snippets[i] if i < len(snippets) else ''
+                # Clean HTML tags and entities from snippet
+                snippet = unescape(TAG_RE.sub('', snippet))
 
-                    snippet = snippets[i] if i < len(snippets) else ''
-                    # Clean HTML tags from snippet
-                    snippet = re.sub(r'<[^>]+>', '', snippet)
-
-                    results.append({
-                        'title': title.strip(),
-                        'url': actual_url,
-                        'snippet': snippet.strip()[:200]
-                    })
+                results.append({
+                    'title': unescape(title).strip(),
+                    'url': actual_url,
+                    'snippet': snippet.strip()[:200]
+                })
 
         except Exception as e:
             print(f"DuckDuckGo search error: {e}")
@@ -157,27 +353,19 @@ class WebSearcher:
     def fetch_page_text(url: str, max_length: int = 2000) -> str:
         """Fetch a page and extract readable text"""
         try:
-            req = urllib.request.Request(url)
-            req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-
-            with urllib.request.urlopen(req, timeout=10) as response:
-                html = response.read().decode('utf-8', errors='ignore')
+            headers = {'User-Agent': BROWSER_USER_AGENT}
 
-                import re
-                # Remove script and style tags
-                html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-                html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+            html = http_get(url, headers, max_bytes=PAGE_FETCH_LIMIT).decode('utf-8', errors='ignore')
 
-                # Extract title
-                title_match = re.search(r'<title[^>]*>([^<]+)</title>', html, re.IGNORECASE)
-                title = title_match.group(1).strip() if title_match else ''
+            # Extract title
+            title_match = TITLE_RE.search(html)
+            title = title_match.group(1).strip() if title_match else ''
 
-                # Remove all HTML tags
-                text = re.sub(r'<[^>]+>', ' ', html)
-                # Clean up whitespace
-                text = re.sub(r'\s+', ' ', text).strip()
+            # Drop script/style blocks and all other tags in one pass,
+            # then collapse whitespace
+            text = ' '.join(PAGE_MARKUP_RE.sub(' ', html).split())
 
-                return f"Title: {title}\n\n{text[:max_length]}"
+            return f"Title: {title}\n\n{text[:max_length]}"
 
         except Exception as e:
             return f"Error fetching page: {e}"
@@ -192,24 +380,23 @@ class PartLookup:
         try:
             base_url = api_config.get('url', 'https://api.upcitemdb.com/prod/trial/lookup')
             url = f"{base_url}?upc={code}"
-            req = urllib.request.Request(url)
+            headers = {}
 
             # Add API key header if provided
             if api_config.get('api_key'):
-                req.add_header('Authorization', f"Bearer {api_config['api_key']}")
-
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                if data.get('items'):
-                    item = data['items'][0]
-                    return {
-                        'source': api_config.get('name', 'UPCitemdb'),
-                        'title': item.get('title', ''),
-                        'brand': item.get('brand', ''),
-                        'model': item.get('model', ''),
-                        'description': item.get('description', ''),
-                        'category': item.get('category', ''),
-                    }
+                headers['Authorization'] = f"Bearer {api_config['api_key']}"
+
+            data = json_loads(http_get(url, headers))
+            if data.get('items'):
+                item = data['items'][0]
+                return {
+                    'source': api_config.get('name', 'UPCitemdb'),
+                    'title': item.get('title', ''),
+                    'brand': item.get('brand', ''),
+                    'model': item.get('model', ''),
+                    'description': item.get('description', ''),
+                    'category': item.get('category', ''),
+                }
         except Exception as e:
             print(f"{api_config.get('name', 'UPCitemdb')} error: {e}")
         return None
@@ -221,24 +408,24 @@ class PartLookup:
             encoded = urllib.parse.quote(code)
             base_url = api_config.get('url', '')
             url = f"{base_url}?keyword={encoded}"
-            req = urllib.request.Request(url)
-            req.add_header('x-rapidapi-host', api_config.get('host', ''))
-            req.add_header('x-rapidapi-key', api_config.get('api_key', ''))
-
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                if data.get('status') == 'success' and data.get('products'):
-                    product = data['products'][0]
-                    return {
-                        'source': api_config.get('name', 'RapidAPI'),
-                        'title': product.get('productName', ''),
-                        'brand': product.get('manufacturerName', ''),
-                        'model': product.get('partNumber', ''),
-                        'description': product.get('category', ''),
-                        'category': product.get('category', ''),
-                        'price': product.get('regularPrice'),
-                        'warranty': product.get('warrantyDetails', ''),
-                    }
+            headers = {
+                'x-rapidapi-host': api_config.get('host', ''),
+                'x-rapidapi-key': api_config.get('api_key', ''),
+            }
+
+            data = json_loads(http_get(url, headers))
+            if data.get('status') == 'success' and data.get('products'):
+                product = data['products'][0]
+                return {
+                    'source': api_config.get('name', 'RapidAPI'),
+                    'title': product.get('productName', ''),
+                    'brand': product.get('manufacturerName', ''),
+                    'model': product.get('partNumber', ''),
+                    'description': product.get('category', ''),
+                    'category': product.get('category', ''),
+                    'price': product.get('regularPrice'),
+                    'warranty': product.get('warrantyDetails', ''),
+                }
         except Exception as e:
             print(f"{api_config.get('name', 'RapidAPI')} error: {e}")
         return None
@@ -251,25 +438,24 @@ class PartLookup:
             base_url = api_config.get('url', '')
             param_name = api_config.get('param_name', 'q')
             url = f"{base_url}?{param_name}={encoded}"
-            req = urllib.request.Request(url)
+            headers = {}
 
             # Add headers
             if api_config.get('api_key'):
                 header_name = api_config.get('api_key_header', 'Authorization')
-                req.add_header(header_name, api_config['api_key'])
-
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                # Try to extract common fields
-                if data:
-                    return {
-                        'source': api_config.get('name', 'Custom API'),
-                        'title': str(data)[:100],
-                        'brand': '',
-                        'model': code,
-                        'description': '',
-                        'category': '',
-                    }
+                headers[header_name] = api_config['api_key']
+
+            data = json_loads(http_get(url, headers))
+            # Try to extract common fields
+            if data:
+                return {
+                    'source': api_config.get('name', 'Custom API'),
+                    'title': str(data)[:100],
+                    'brand': '',
+                    'model': code,
+                    'description': '',
+                    'category': '',
+                }
         except Exception as e:
             print(f"{api_config.get('name', 'Custom API')} error: {e}")
         return None
@@ -287,16 +473,38 @@ class PartLookup:
             return PartLookup.lookup_generic(code, api_config)
 
     @staticmethod
-    def lookup_all(code: str) -> List[Dict]:
-        """Lookup code in all enabled APIs"""
-        results = []
-
-        for api_config in config_manager.get_enabled_apis():
-            result = PartLookup.lookup_single(code, api_config)
+    def lookup_cached(code: str, api_config: dict) -> Optional[Dict]:
+        """lookup_single, answered from memory when this API was recently asked for the code"""
+        key = (code.strip().upper(), json.dumps(api_config, sort_keys=True))
+        with _lookup_cache_lock:
+            entry = _lookup_cache.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                _lookup_cache.move_to_end(key)
+                return dict(entry[1]) if entry[1] else None
+
+        result = PartLookup.lookup_single(code, api_config)
+        with _lookup_cache_lock:
             if result:
-                results.append(result)
+                _lookup_cache[key] = (None, dict(result))
+            else:
+                _lookup_cache[key] = (time.monotonic() + LOOKUP_MISS_TTL, None)
+            _lookup_cache.move_to_end(key)
+            if len(_lookup_cache) > LOOKUP_CACHE_SIZE:
+                _lookup_cache.popitem(last=False)
+        return result
 
-        return results
+    @staticmethod
+    def clear_cache() -> None:
+        """Forget all cached lookup results"""
+        with _lookup_cache_lock:
+            _lookup_cache.clear()
+
+    @staticmethod
+    def lookup_all(code: str) -> List[Dict]:
+        """Lookup code in all enabled APIs at once; results keep the APIs' order"""
+        apis = config_manager.get_enabled_apis()
+        results = _lookup_pool.map(lambda api_config: PartLookup.lookup_cached(code, api_config), apis)
+        return [result for result in results if result]
 
 
 @dataclass
@@ -309,10 +517,10 @@ class InventoryItem:
     updated_at: str = ""
     
     def __post_init__(self):
-        if not self.created_at:
-            self.created_at = datetime.now().isoformat()
-        if not self.updated_at:
-            self.updated_at = datetime.now().isoformat()
+        if not (self.created_at and self.updated_at):
+            now = datetime.now().isoformat()
+            self.created_at = self.created_at or now
+            self.updated_at = self.updated_at or now
         if self.additional_info is None:
             self.additional_info = {}
 
@@ -321,7 +529,7 @@ class InventoryItem:
 class LocationInventory:
     """Represents inventory at a specific location"""
     item_upc: str
-    location_id: str
+    location_id: int
     quantity: int
     last_scanned: str = ""
     
@@ -333,176 +541,548 @@ class LocationInventory:
 class InventoryDatabase:
     """Handles all database operations"""
     
+    # Queued scans are written as soon as this many are waiting, and at
+    # least every FLUSH_INTERVAL seconds otherwise
+    FLUSH_THRESHOLD = 50
+    FLUSH_INTERVAL = 0.1
+    
     def __init__(self, db_path: str = "inventory.db"):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # Autocommit mode: single statements commit on their own and batches
+        # open their transaction explicitly with BEGIN IMMEDIATE. The writer is
+        # guarded by write_lock, so the per-call thread check is not needed
+        self.conn = sqlite3.connect(db_path, isolation_level=None, cached_statements=256,
+                                    check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self.cur = self.conn.cursor()
+        
+        # WAL lets readers run alongside scan writes and only needs an fsync
+        # at checkpoints with synchronous=NORMAL. The database then keeps
+        # inventory.db-wal / inventory.db-shm files next to it while open.
+        if db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        # INSERT OR REPLACE only fires the location_summary delete trigger
+        # for the replaced row when recursive triggers are on
+        self.conn.execute("PRAGMA recursive_triggers=ON")
+        
+        # Recorded with every scan; fixed for the life of the process
+        self.workstation_id = os.environ.get('COMPUTERNAME') or platform.node() or 'unknown'
+        
+        # Scans queued by scan_item until the next flush(). The queue has its
+        # own lock so queueing a scan never waits on a write in progress
+        self._pending: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        # Serializes use of the write connection between threads
+        self.write_lock = threading.RLock()
+        # How many tx() blocks are open on the write connection
+        self._tx_depth = 0
+        
         self.init_database()
+        
+        # Queued scans are written by a background thread so the UI never
+        # waits on the disk; its last failure is kept for the UI to report
+        self.last_write_error: Optional[Exception] = None
+        # Called with the UPCs of each batch of scans committed, usually from
+        # the writer thread; reads don't flush, so this is how callers learn
+        # scans have landed
+        self.on_commit = None
+        self._closing = False
+        self._wake_writer = threading.Event()
+        self._writer = threading.Thread(target=self._writer_loop, name="inventory-writer", daemon=True)
+        self._writer.start()
+        
+        # Reads go through their own read-only connection so they don't wait
+        # on a batch being written; under WAL they see the last commit
+        if db_path == ":memory:":
+            self.rconn = self.conn
+        else:
+            self.rconn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True,
+                                         isolation_level=None, check_same_thread=False)
+            self.rconn.row_factory = sqlite3.Row
+            self.rconn.execute("PRAGMA query_only=1")
+            self.rconn.execute("PRAGMA temp_store=MEMORY")
+            self.rconn.execute("PRAGMA mmap_size=268435456")
+        # Reads come from the UI thread; one cursor serves all of them
+        self.rcur = self.rconn.cursor()
+        # (data_version, rows) of the last location summary
+        self._summary_cache = None
+    
+    @contextmanager
+    def tx(self):
+        """Run a block of writes as one transaction; nested uses join the open one"""
+        with self.write_lock:
+            if self._tx_depth:
+                self._tx_depth += 1
+                try:
+                    yield self.cur
+                finally:
+                    self._tx_depth -= 1
+                return
+            self.cur.execute('BEGIN IMMEDIATE')
+            self._tx_depth = 1
+            try:
+                yield self.cur
+                # A failed COMMIT leaves the transaction open; roll it back too
+                self.cur.execute('COMMIT')
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                self._tx_depth = 0
     
     def init_database(self):
         """Initialize database schema"""
-        cursor = self.conn.cursor()
+        # Up-to-date databases skip the DDL below on every start
+        self.cur.execute('PRAGMA user_version')
+        if self.cur.fetchone()[0] >= SCHEMA_VERSION:
+            return
         
-        # Create locations table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS locations (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL UNIQUE,
-                description TEXT,
-                created_at TEXT NOT NULL
-            )
-        ''')
+        # One transaction, so a half-finished upgrade is never left behind
+        with self.tx() as cursor:
+            # Databases from before integer location ids are rebuilt below
+            cursor.execute('PRAGMA table_info(locations)')
+            location_columns = [row['name'] for row in cursor.fetchall()]
+            migrate_locations = bool(location_columns) and 'uuid' not in location_columns
+            if migrate_locations:
+                self._retire_text_location_tables(cursor)
+            
+            # Create locations table. The integer id is local to this database;
+            # uuid identifies the location across workstations when syncing
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS locations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    uuid TEXT NOT NULL UNIQUE,
+                    name TEXT NOT NULL UNIQUE,
+                    description TEXT,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            
+            # Create items table. Defaults let a scan register a new UPC with
+            # just "INSERT ... (upc)"
+            cursor.execute(ITEMS_TABLE_SQL.format(name='items', if_not_exists='IF NOT EXISTS'))
+            
+            # Older items tables have no defaults and SQLite can't add them in
+            # place, so rebuild the table once
+            cursor.execute('PRAGMA table_info(items)')
+            if {row['name']: row['dflt_value'] for row in cursor.fetchall()}['created_at'] is None:
+                cursor.execute(ITEMS_TABLE_SQL.format(name='items_new', if_not_exists=''))
+                cursor.execute('''
+                    INSERT INTO items_new (upc, description, additional_info, created_at, updated_at)
+                    SELECT upc, description, COALESCE(additional_info, '{}'), created_at, updated_at
+                    FROM items
+                ''')
+                cursor.execute('DROP TABLE items')
+                cursor.execute('ALTER TABLE items_new RENAME TO items')
+            
+            # Create inventory table (items at locations)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS inventory (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    item_upc TEXT NOT NULL,
+                    location_id INTEGER NOT NULL,
+                    quantity INTEGER NOT NULL DEFAULT 0,
+                    last_scanned TEXT NOT NULL,
+                    FOREIGN KEY (item_upc) REFERENCES items(upc),
+                    FOREIGN KEY (location_id) REFERENCES locations(id),
+                    UNIQUE(item_upc, location_id)
+                )
+            ''')
+            
+            # Create scan history table for audit trail
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS scan_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    item_upc TEXT NOT NULL,
+                    location_id INTEGER NOT NULL,
+                    action TEXT NOT NULL,
+                    quantity_change INTEGER,
+                    scanned_at TEXT NOT NULL,
+                    workstation_id TEXT
+                )
+            ''')
+            
+            if migrate_locations:
+                self._copy_text_location_tables(cursor)
+            
+            # Per-location totals for the summary view, kept current by triggers
+            # on inventory instead of aggregating the whole table on every open
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'location_summary'")
+            summary_exists = cursor.fetchone() is not None
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS location_summary (
+                    location_id INTEGER PRIMARY KEY,
+                    item_count INTEGER NOT NULL DEFAULT 0,
+                    total_qty INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_inventory_summary_insert
+                AFTER INSERT ON inventory
+                BEGIN
+                    INSERT INTO location_summary (location_id, item_count, total_qty)
+                    VALUES (NEW.location_id, 1, NEW.quantity)
+                    ON CONFLICT(location_id) DO UPDATE SET
+                        item_count = item_count + 1,
+                        total_qty = total_qty + NEW.quantity;
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_inventory_summary_update
+                AFTER UPDATE OF location_id, quantity ON inventory
+                BEGIN
+                    UPDATE location_summary
+                    SET item_count = item_count - 1, total_qty = total_qty - OLD.quantity
+                    WHERE location_id = OLD.location_id;
+                    INSERT INTO location_summary (location_id, item_count, total_qty)
+                    VALUES (NEW.location_id, 1, NEW.quantity)
+                    ON CONFLICT(location_id) DO UPDATE SET
+                        item_count = item_count + 1,
+                        total_qty = total_qty + NEW.quantity;
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_inventory_summary_delete
+                AFTER DELETE ON inventory
+                BEGIN
+                    UPDATE location_summary
+                    SET item_count = item_count - 1, total_qty = total_qty - OLD.quantity
+                    WHERE location_id = OLD.location_id;
+                END
+            ''')
+            if not summary_exists:
+                # Existing database: seed the totals from the current inventory
+                cursor.execute('''
+                    INSERT INTO location_summary (location_id, item_count, total_qty)
+                    SELECT location_id, COUNT(*), COALESCE(SUM(quantity), 0)
+                    FROM inventory
+                    GROUP BY location_id
+                ''')
+            
+            # One row per additional_info key, so a single key can be changed
+            # and items found by attribute without parsing JSON. additional_info
+            # stays the copy that is displayed and exported
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_attributes'")
+            attributes_exist = cursor.fetchone() is not None
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS item_attributes (
+                    upc TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (upc, key)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_attr_key_value ON item_attributes(key, value)')
+            if not attributes_exist:
+                # Existing database: fill it from the JSON already stored
+                cursor.execute("SELECT upc, additional_info FROM items WHERE additional_info NOT IN ('', '{}')")
+                for row in cursor.fetchall():
+                    self._write_item_attributes(cursor, row['upc'], json_loads(row['additional_info']))
+            
+            # Indexes for the per-location and per-item inventory listings
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_inv_loc_lastscan ON inventory(location_id, last_scanned DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_inv_upc_qty ON inventory(item_upc, quantity DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_upc ON scan_history(item_upc, scanned_at)')
+            
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         
-        # Create items table
+        # Give the query planner statistics once; PRAGMA optimize in close()
+        # refreshes them as the tables grow
+        cursor = self.cur
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if not cursor.fetchone():
+            cursor.execute('ANALYZE')
+    
+    @staticmethod
+    def _write_item_attributes(cursor, upc: str, additional_info: Dict) -> None:
+        """Bring an item's item_attributes rows in line with its additional info"""
+        cursor.execute('SELECT key, value FROM item_attributes WHERE upc = ?', (upc,))
+        current = {row['key']: row['value'] for row in cursor.fetchall()}
+        wanted = {key: value if isinstance(value, str) else json.dumps(value)
+                  for key, value in additional_info.items()}
+        
+        # Only keys that were added, changed or removed are written
+        cursor.executemany(SQL_UPSERT_ATTRIBUTE, [
+            (upc, key, value) for key, value in wanted.items() if current.get(key) != value
+        ])
+        cursor.executemany('DELETE FROM item_attributes WHERE upc = ? AND key = ?',
+                           [(upc, key) for key in current if key not in wanted])
+    
+    @staticmethod
+    def _retire_text_location_tables(cursor):
+        """Move tables keyed by TEXT location ids aside so they can be rebuilt"""
+        for trigger in ('trg_inventory_summary_insert', 'trg_inventory_summary_update',
+                        'trg_inventory_summary_delete'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        for index in ('idx_inv_loc_lastscan', 'idx_inv_upc_qty', 'idx_history_upc'):
+            cursor.execute(f'DROP INDEX IF EXISTS {index}')
+        cursor.execute('DROP TABLE IF EXISTS location_summary')
+        for table in ('locations', 'inventory', 'scan_history'):
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+    
+    @staticmethod
+    def _copy_text_location_tables(cursor):
+        """Copy the retired tables into the integer-keyed schema and drop them"""
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                upc TEXT PRIMARY KEY,
-                description TEXT,
-                additional_info TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
+            INSERT INTO locations (uuid, name, description, created_at)
+            SELECT id, name, description, created_at FROM locations_old
+            ORDER BY created_at
         ''')
-        
-        # Create inventory table (items at locations)
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_upc TEXT NOT NULL,
-                location_id TEXT NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 0,
-                last_scanned TEXT NOT NULL,
-                FOREIGN KEY (item_upc) REFERENCES items(upc),
-                FOREIGN KEY (location_id) REFERENCES locations(id),
-                UNIQUE(item_upc, location_id)
-            )
+            INSERT INTO inventory (id, item_upc, location_id, quantity, last_scanned)
+            SELECT inv.id, inv.item_upc, l.id, inv.quantity, inv.last_scanned
+            FROM inventory_old inv
+            JOIN locations l ON l.uuid = inv.location_id
         ''')
-        
-        # Create scan history table for audit trail
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scan_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_upc TEXT NOT NULL,
-                location_id TEXT NOT NULL,
-                action TEXT NOT NULL,
-                quantity_change INTEGER,
-                scanned_at TEXT NOT NULL,
-                workstation_id TEXT
-            )
+            INSERT INTO scan_history (id, item_upc, location_id, action, quantity_change, scanned_at, workstation_id)
+            SELECT h.id, h.item_upc, l.id, h.action, h.quantity_change, h.scanned_at, h.workstation_id
+            FROM scan_history_old h
+            JOIN locations l ON l.uuid = h.location_id
         ''')
-        
-        self.conn.commit()
+        for table in ('scan_history', 'inventory', 'locations'):
+            cursor.execute(f'DROP TABLE {table}_old')
     
-    def add_location(self, name: str, description: str = "") -> str:
+    def add_location(self, name: str, description: str = "") -> int:
         """Add a new location"""
-        location_id = str(uuid.uuid4())
-        cursor = self.conn.cursor()
         try:
-            cursor.execute('''
-                INSERT INTO locations (id, name, description, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', (location_id, name, description, datetime.now().isoformat()))
-            self.conn.commit()
-            return location_id
+            with self.tx() as cursor:
+                cursor.execute(SQL_INSERT_LOCATION,
+                               (str(uuid.uuid4()), name, description, datetime.now().isoformat()))
+                return cursor.lastrowid
         except sqlite3.IntegrityError:
             raise ValueError(f"Location '{name}' already exists")
     
     def get_locations(self) -> List[Dict]:
         """Get all locations"""
-        cursor = self.conn.cursor()
+        cursor = self.rcur
         cursor.execute('SELECT * FROM locations ORDER BY name')
         return [dict(row) for row in cursor.fetchall()]
     
     def add_or_update_item(self, upc: str, description: str = "", additional_info: Dict = None) -> None:
         """Add or update an item"""
-        cursor = self.conn.cursor()
-        info_json = json.dumps(additional_info or {})
-        
-        cursor.execute('''
-            INSERT INTO items (upc, description, additional_info, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(upc) DO UPDATE SET
-                description = COALESCE(excluded.description, description),
-                additional_info = excluded.additional_info,
-                updated_at = excluded.updated_at
-        ''', (upc, description, info_json, datetime.now().isoformat(), datetime.now().isoformat()))
-        self.conn.commit()
-    
-    def scan_item(self, upc: str, location_id: str, quantity: int = 1) -> None:
-        """Scan an item at a location"""
-        cursor = self.conn.cursor()
+        self.flush()
+        if not description and additional_info is None:
+            # Nothing to set; make sure the item exists and let the schema fill it in
+            with self.tx() as cursor:
+                cursor.execute(SQL_INSERT_ITEM, (upc,))
+            return
         
-        # First ensure the item exists
-        cursor.execute('SELECT upc FROM items WHERE upc = ?', (upc,))
-        if not cursor.fetchone():
-            self.add_or_update_item(upc)
+        additional_info = additional_info or {}
+        now = datetime.now().isoformat()
         
-        # Update inventory
-        cursor.execute('''
-            INSERT INTO inventory (item_upc, location_id, quantity, last_scanned)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(item_upc, location_id) DO UPDATE SET
-                quantity = quantity + ?,
-                last_scanned = ?
-        ''', (upc, location_id, quantity, datetime.now().isoformat(), quantity, datetime.now().isoformat()))
-        
-        # Log scan history
-        cursor.execute('''
-            INSERT INTO scan_history (item_upc, location_id, action, quantity_change, scanned_at, workstation_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (upc, location_id, 'scan', quantity, datetime.now().isoformat(), os.environ.get('COMPUTERNAME', 'unknown')))
+        with self.tx() as cursor:
+            cursor.execute(SQL_UPSERT_ITEM, (upc, description, json.dumps(additional_info), now, now))
+            self._write_item_attributes(cursor, upc, additional_info)
+    
+    def scan_item(self, upc: str, location_id: int, quantity: int = 1) -> None:
+        """Queue a scan of an item at a location; written by the next flush()"""
+        with self._pending_lock:
+            self._pending.append((upc, location_id, quantity, datetime.now().isoformat()))
+            queued = len(self._pending)
+        if queued >= self.FLUSH_THRESHOLD:
+            self._wake_writer.set()
+    
+    def scan_items_bulk(self, scans: List[tuple]) -> None:
+        """Record (upc, location_id, quantity, scanned_at) scans in one transaction"""
+        if not scans:
+            return
         
-        self.conn.commit()
+        with self.tx() as cursor:
+            # First ensure the items exist; known UPCs are ignored by the insert
+            cursor.executemany(SQL_INSERT_ITEM, [(upc,) for upc in dict.fromkeys(scan[0] for scan in scans)])
+            
+            # Update inventory once per item and location in the batch,
+            # then log every scan to the history
+            totals = {}
+            for upc, location_id, quantity, scanned_at in scans:
+                total = totals.get((upc, location_id))
+                if total is None:
+                    totals[(upc, location_id)] = [quantity, scanned_at]
+                else:
+                    total[0] += quantity
+                    total[1] = max(total[1], scanned_at)
+            cursor.executemany(SQL_UPSERT_INV, [
+                (upc, location_id, quantity, scanned_at)
+                for (upc, location_id), (quantity, scanned_at) in totals.items()
+            ])
+            workstation_id = self.workstation_id
+            for start in range(0, len(scans), HISTORY_ROWS_PER_INSERT):
+                chunk = scans[start:start + HISTORY_ROWS_PER_INSERT]
+                params = []
+                for upc, location_id, quantity, scanned_at in chunk:
+                    params += (upc, location_id, quantity, scanned_at, workstation_id)
+                cursor.execute(history_insert_sql(len(chunk)), params)
     
-    def get_inventory_by_location(self, location_id: str) -> List[Dict]:
-        """Get all inventory for a location"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT i.*, inv.quantity, inv.last_scanned
-            FROM inventory inv
-            JOIN items i ON inv.item_upc = i.upc
-            WHERE inv.location_id = ?
-            ORDER BY inv.last_scanned DESC
-        ''', (location_id,))
+    def flush(self) -> List[str]:
+        """Write all queued scans in a single transaction; returns the UPCs written"""
+        # Checked before write_lock so nothing waits on a commit in progress
+        # only to find there is nothing to write
+        with self._pending_lock:
+            if not self._pending:
+                return []
+        with self.write_lock:
+            with self._pending_lock:
+                if not self._pending:
+                    return []
+                pending, self._pending = self._pending, []
+            try:
+                self.scan_items_bulk(pending)
+            except Exception:
+                with self._pending_lock:
+                    self._pending[:0] = pending  # Keep them for the next attempt
+                raise
+        upcs = list(dict.fromkeys(scan[0] for scan in pending))
+        on_commit = self.on_commit
+        if on_commit is not None:
+            on_commit(upcs)
+        return upcs
+    
+    def _writer_loop(self):
+        """Background thread: flush queued scans until the database is closed"""
+        while not self._closing:
+            self._wake_writer.wait(self.FLUSH_INTERVAL)
+            self._wake_writer.clear()
+            # Any failure is reported, never allowed to end the thread
+            try:
+                self.flush()
+            except Exception as e:
+                self.last_write_error = e
+    
+    def stop_writer(self) -> threading.Thread:
+        """Ask the background writer to finish and return its thread"""
+        self._closing = True
+        self._wake_writer.set()
+        return self._writer
+    
+    def get_inventory_by_location(self, location_id: int, limit: Optional[int] = None,
+                                  offset: int = 0, search: str = "") -> List[Dict]:
+        """Get inventory for a location, optionally one page and/or filtered by UPC or description"""
+        query = SQL_INVENTORY_ROWS + ' WHERE inv.location_id = ?'
+        params = [location_id]
+        if search:
+            # Match the typed text literally, not as LIKE wildcards
+            pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query += " AND (i.upc LIKE ? ESCAPE '\\' OR i.description LIKE ? ESCAPE '\\')"
+            params += [f'%{pattern}%'] * 2
+        query += ' ORDER BY inv.last_scanned DESC'
+        if limit is not None:
+            query += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        
+        cursor = self.rcur
+        cursor.execute(query, params)
         
         results = []
         for row in cursor.fetchall():
             item = dict(row)
-            if item['additional_info']:
-                item['additional_info'] = json.loads(item['additional_info'])
+            # Most freshly scanned items carry no extra info; skip the decoder for them
+            info = item['additional_info']
+            item['additional_info'] = json_loads(info) if info and info != '{}' else {}
             results.append(item)
         return results
     
+    def get_inventory_item(self, upc: str, location_id: int) -> Optional[Dict]:
+        """Get one item's inventory at a location"""
+        cursor = self.rcur
+        cursor.execute(SQL_INVENTORY_ROWS + ' WHERE inv.item_upc = ? AND inv.location_id = ?',
+                       (upc, location_id))
+        
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        item = dict(row)
+        info = item['additional_info']
+        item['additional_info'] = json_loads(info) if info and info != '{}' else {}
+        return item
+    
+    def get_item(self, upc: str) -> Optional[Dict]:
+        """Get an item with its additional info decoded, or None if it doesn't exist"""
+        cursor = self.rcur
+        cursor.execute('SELECT * FROM items WHERE upc = ?', (upc,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        item = dict(row)
+        item['additional_info'] = json_loads(item['additional_info']) if item['additional_info'] else {}
+        return item
+    
+    def get_item_description(self, upc: str) -> Optional[str]:
+        """Get an item's description ('' if it has none), or None if it doesn't exist"""
+        cursor = self.rcur
+        cursor.execute('SELECT description FROM items WHERE upc = ?', (upc,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return row['description'] or ''
+    
+    def get_location_summary(self) -> List[Dict]:
+        """Get item and quantity totals per location, cached until the database changes"""
+        cursor = self.rcur
+        # data_version moves whenever another connection commits, which
+        # covers scans and imports; the shared :memory: connection is not cached
+        version = cursor.execute('PRAGMA data_version').fetchone()[0]
+        if self._summary_cache is None or self._summary_cache[0] != version or self.rconn is self.conn:
+            cursor.execute(SQL_LOCATION_SUMMARY)
+            self._summary_cache = (version, [dict(row) for row in cursor])
+        return self._summary_cache[1]
+    
+    def find_items_by_attribute(self, key: str, value: str) -> List[str]:
+        """Get the UPCs of items whose additional info has key set to value"""
+        cursor = self.rcur
+        cursor.execute('SELECT upc FROM item_attributes WHERE key = ? AND value = ? ORDER BY upc', (key, value))
+        return [row['upc'] for row in cursor.fetchall()]
+    
     def get_item_locations(self, upc: str) -> List[Dict]:
         """Get all locations where an item exists"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT l.*, inv.quantity, inv.last_scanned
-            FROM inventory inv
-            JOIN locations l ON inv.location_id = l.id
-            WHERE inv.item_upc = ?
-            ORDER BY inv.quantity DESC
-        ''', (upc,))
+        cursor = self.rcur
+        cursor.execute(SQL_ITEM_LOCATIONS, (upc,))
         return [dict(row) for row in cursor.fetchall()]
     
+    def update_item_description(self, upc: str, description: str) -> None:
+        """Update the description of an item"""
+        self.flush()
+        with self.tx() as cursor:
+            cursor.execute(SQL_UPDATE_DESCRIPTION, (description, datetime.now().isoformat(), upc))
+    
     def update_item_info(self, upc: str, additional_info: Dict[str, str]) -> None:
         """Update additional info for an item"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            UPDATE items 
-            SET additional_info = ?, updated_at = ?
-            WHERE upc = ?
-        ''', (json.dumps(additional_info), datetime.now().isoformat(), upc))
-        self.conn.commit()
+        self.flush()
+        with self.tx() as cursor:
+            cursor.execute(SQL_UPDATE_INFO, (json.dumps(additional_info), datetime.now().isoformat(), upc))
+            self._write_item_attributes(cursor, upc, additional_info)
+    
+    def save_item_identification(self, upc: str, description: str, additional_info: Dict[str, str] = None) -> None:
+        """Set an item's description and, when given, its additional info in one transaction"""
+        if additional_info is None:
+            self.update_item_description(upc, description)
+            return
+        self.flush()
+        with self.tx() as cursor:
+            cursor.execute(SQL_UPDATE_IDENTIFICATION,
+                           (description, json.dumps(additional_info), datetime.now().isoformat(), upc))
+            self._write_item_attributes(cursor, upc, additional_info)
     
     def close(self):
         """Close database connection"""
+        self.stop_writer().join()
+        self.flush()
+        if self.rconn is not self.conn:
+            self.rconn.close()
+        self.conn.execute('PRAGMA optimize')
         self.conn.close()
 
 
 class InventoryScanner(tk.Tk):
     """Main application window"""
     
+    # Rows fetched per page of the inventory list
+    INVENTORY_PAGE_SIZE = 200
+    
     def __init__(self):
         super().__init__()
         
@@ -513,9 +1093,23 @@ class InventoryScanner(tk.Tk):
         script_dir = Path(__file__).parent.resolve()
         db_path = script_dir / "inventory.db"
         self.db = InventoryDatabase(str(db_path))
+        # Imports write through the scanner's connection and write lock
+        self.sync = InventorySync(self.db.db_path, conn=self.db.conn, lock=self.db.write_lock)
+        # Scanned rows are redrawn once the writer thread has committed them
+        self.db.on_commit = self._on_scans_committed
         
         # Current scanning location
         self.current_location_id = None
+        self._name_to_id = {}
+        
+        # Inventory list paging and search state
+        self._inventory_exhausted = False
+        self._search_after_id = None
+        
+        self._status_after_id = None
+        
+        # (thread, cancel event) of a running master database build
+        self._master_task = None
         
         # Setup UI
         self.setup_ui()
@@ -525,6 +1119,27 @@ class InventoryScanner(tk.Tk):
         
         # Bind enter key to scan
         self.bind('<Return>', lambda e: self.scan_barcode())
+        
+        # Report failures of the background scan writer
+        self.after(500, self._check_write_errors)
+    
+    def clear_status_later(self, delay: int = 2000):
+        """Clear the status bar after delay ms, replacing any clear already pending"""
+        if self._status_after_id is not None:
+            self.after_cancel(self._status_after_id)
+        self._status_after_id = self.after(delay, self._clear_status)
+
+    def _clear_status(self):
+        """Clear the status bar"""
+        self._status_after_id = None
+        self.status_var.set("")
+
+    def _check_write_errors(self):
+        """Show the last background write failure, if any, and reschedule"""
+        error, self.db.last_write_error = self.db.last_write_error, None
+        if error is not None:
+            self.status_var.set(f"Failed to save scans: {error}")
+        self.after(500, self._check_write_errors)
     
     def setup_ui(self):
         """Setup the user interface"""
@@ -586,10 +1201,10 @@ class InventoryScanner(tk.Tk):
         self.tree.heading('Quantity', text='Qty')
         self.tree.heading('Last Scanned', text='Last Scanned')
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(inv_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar; scrolling near the end loads the next page of rows
+        self.inventory_scrollbar = ttk.Scrollbar(inv_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.inventory_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=self._on_inventory_scroll)
         
         # Bottom buttons
         button_frame = ttk.Frame(self, padding="10")
@@ -599,6 +1214,12 @@ class InventoryScanner(tk.Tk):
         ttk.Button(button_frame, text="View All Locations", command=self.view_all_locations).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Refresh", command=self.refresh_inventory).pack(side=tk.LEFT, padx=5)
         
+        # Search box to jump to items instead of scrolling through large locations
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self._on_search_changed)
+        ttk.Entry(button_frame, textvariable=self.search_var, width=25).pack(side=tk.RIGHT, padx=5)
+        ttk.Label(button_frame, text="Search:").pack(side=tk.RIGHT)
+        
         # Sync operations frame
         sync_frame = ttk.LabelFrame(self, text="Sync Operations", padding="10")
         sync_frame.grid(row=4, column=0, sticky=(tk.W, tk.E), padx=10, pady=5)
@@ -618,7 +1239,8 @@ class InventoryScanner(tk.Tk):
     def refresh_locations(self):
         """Refresh the locations dropdown"""
         locations = self.db.get_locations()
-        self.location_combo['values'] = [loc['name'] for loc in locations]
+        self._name_to_id = {loc['name']: loc['id'] for loc in locations}
+        self.location_combo['values'] = list(self._name_to_id)
         
         if locations and not self.current_location_id:
             self.location_combo.current(0)
@@ -626,15 +1248,19 @@ class InventoryScanner(tk.Tk):
     
     def on_location_changed(self, event):
         """Handle location selection change"""
-        selected_name = self.location_var.get()
-        locations = self.db.get_locations()
-        
-        for loc in locations:
-            if loc['name'] == selected_name:
-                self.current_location_id = loc['id']
-                self.refresh_inventory()
-                break
+        location_id = self._name_to_id.get(self.location_var.get())
+        if location_id is not None:
+            self.current_location_id = location_id
+            self.refresh_inventory()
     
+    @staticmethod
+    def _valid_upc(code: str) -> bool:
+        """Check the check digit of EAN-8/UPC-A/EAN-13 codes; other codes always pass"""
+        if len(code) not in (8, 12, 13) or not code.isdecimal():
+            return True
+        total = sum(map(operator.mul, map(int, code[-2::-1]), GTIN_WEIGHTS))
+        return (10 - total % 10) % 10 == int(code[-1])
+
     def scan_barcode(self):
         """Handle barcode scanning"""
         barcode = self.barcode_var.get().strip()
@@ -642,22 +1268,24 @@ class InventoryScanner(tk.Tk):
         if not barcode:
             return
 
+        if not self._valid_upc(barcode):
+            # Misread; don't record it
+            self.bell()
+            self.status_var.set(f"Bad check digit, please rescan: {barcode}")
+            self.barcode_var.set("")
+            self.clear_status_later(3000)
+            return
+
         if not self.current_location_id:
             messagebox.showerror("Error", "Please select a location first")
             return
 
         try:
-            # Check if item already exists and has been identified
-            cursor = self.db.conn.cursor()
-            cursor.execute('SELECT description, additional_info FROM items WHERE upc = ?', (barcode,))
-            existing = cursor.fetchone()
-
-            if existing:
-                desc = existing['description'] or ''
-                add_info_str = existing['additional_info'] or '{}'
-                add_info = json.loads(add_info_str) if add_info_str else {}
-                attempted_parts = add_info.get('attempted_parts', '').split(' | ') if add_info.get('attempted_parts') else []
+            # Check if item already exists and has been identified. New items
+            # are added right away below, so queued scans needn't be flushed first
+            desc = self.db.get_item_description(barcode)
 
+            if desc is not None:
                 # Check if item is identified (has real description, not "Not Identified" or empty)
                 is_identified = desc and desc != "Not Identified" and desc != "No description"
 
@@ -666,23 +1294,23 @@ class InventoryScanner(tk.Tk):
                     self.db.scan_item(barcode, self.current_location_id)
                     self.status_var.set(f"Added: {desc[:40]}... (Qty +1)")
                     self.barcode_var.set("")
-                    self.refresh_inventory()
-                    self.after(2000, lambda: self.status_var.set(""))
+                    self.clear_status_later()
                 else:
                     # Item exists but NOT identified - show dialog to try more lookups or add qty
+                    add_info = self.db.get_item(barcode)['additional_info']
+                    attempted_parts = add_info.get('attempted_parts', '').split(' | ') if add_info.get('attempted_parts') else []
                     self.db.scan_item(barcode, self.current_location_id)
                     self.barcode_var.set("")
-                    self.refresh_inventory()
                     self.show_unidentified_item_dialog(barcode, attempted_parts)
             else:
                 # New item - scan and do API lookup
+                self.db.add_or_update_item(barcode)
                 self.db.scan_item(barcode, self.current_location_id)
                 self.status_var.set(f"Scanned: {barcode} - Looking up...")
                 self.barcode_var.set("")
-                self.refresh_inventory()
 
                 # Trigger API lookup in background thread
-                self.after(100, lambda: self.lookup_part_async(barcode))
+                self.lookup_part_async(barcode)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to scan item: {str(e)}")
@@ -722,11 +1350,10 @@ class InventoryScanner(tk.Tk):
                 qty = int(qty_var.get()) - 1  # -1 because we already added 1 in scan_barcode
                 if qty > 0:
                     self.db.scan_item(upc, self.current_location_id, qty)
-                    self.refresh_inventory()
                 dialog.destroy()
                 total = int(qty_var.get())
                 self.status_var.set(f"Added {total} to: {upc}")
-                self.after(2000, lambda: self.status_var.set(""))
+                self.clear_status_later()
             except ValueError:
                 messagebox.showerror("Error", "Please enter a valid number")
 
@@ -745,6 +1372,8 @@ class InventoryScanner(tk.Tk):
         status_label.pack(pady=5)
 
         def do_lookup():
+            if part_entry.instate(['disabled']):
+                return  # A lookup is already running
             part_num = part_var.get().strip()
             if not part_num:
                 status_label.config(text="Please enter a part number")
@@ -754,20 +1383,25 @@ class InventoryScanner(tk.Tk):
                 previous_attempts.append(part_num)
 
             status_label.config(text=f"Looking up {part_num}...")
-            dialog.update()
+            part_entry.state(['disabled'])
 
-            results = PartLookup.lookup_all(part_num)
+            def show_results(results):
+                if not dialog.winfo_exists():
+                    return  # Closed while the lookup ran
+                part_entry.state(['!disabled'])
+                if results:
+                    dialog.destroy()
+                    self.show_lookup_results_for_upc(upc, part_num, results, add_to_inventory=True)
+                else:
+                    # Update attempted_parts in database
+                    additional_info = {'attempted_parts': ' | '.join(previous_attempts), 'source': 'Not Found'}
+                    self.db.update_item_info(upc, additional_info)
+                    status_label.config(text=f"No results for '{part_num}' - try another")
+                    part_var.set("")
+                    part_entry.focus()
 
-            if results:
-                dialog.destroy()
-                self.show_lookup_results_for_upc(upc, part_num, results, add_to_inventory=True)
-            else:
-                # Update attempted_parts in database
-                additional_info = {'attempted_parts': ' | '.join(previous_attempts), 'source': 'Not Found'}
-                self.db.update_item_info(upc, additional_info)
-                status_label.config(text=f"No results for '{part_num}' - try another")
-                part_var.set("")
-                part_entry.focus()
+            # The dialog stays responsive while the APIs answer
+            self.run_lookup(part_num, show_results)
 
         ttk.Button(lookup_frame, text="Lookup", command=do_lookup).pack(side=tk.LEFT, padx=5)
 
@@ -780,18 +1414,14 @@ class InventoryScanner(tk.Tk):
 
         def save_not_identified():
             # Save with attempted parts
-            cursor = self.db.conn.cursor()
-            cursor.execute(
-                'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?',
-                ("Not Identified", datetime.now().isoformat(), upc)
-            )
+            additional_info = None
             if previous_attempts:
                 additional_info = {'attempted_parts': ' | '.join(previous_attempts), 'source': 'Not Found'}
-                self.db.update_item_info(upc, additional_info)
+            self.db.save_item_identification(upc, "Not Identified", additional_info)
             self.refresh_inventory()
             dialog.destroy()
             self.status_var.set(f"Saved as Not Identified: {upc}")
-            self.after(2000, lambda: self.status_var.set(""))
+            self.clear_status_later()
 
         def manual_entry():
             dialog.destroy()
@@ -819,18 +1449,22 @@ class InventoryScanner(tk.Tk):
         self.barcode_var.set("")
 
         # Trigger API lookup in background thread
-        self.after(100, lambda: self.lookup_part_async(barcode, add_to_inventory=False))
+        self.lookup_part_async(barcode, add_to_inventory=False)
 
-    def lookup_part_async(self, barcode: str, add_to_inventory: bool = True):
-        """Lookup part info asynchronously"""
+    def run_lookup(self, code: str, on_results) -> None:
+        """Look code up in all enabled APIs on a worker thread, then call on_results(results) on the UI thread"""
         def do_lookup():
-            results = PartLookup.lookup_all(barcode)
+            results = PartLookup.lookup_all(code)
             # Schedule UI update on main thread
-            self.after(0, lambda: self.show_lookup_results(barcode, results, add_to_inventory))
+            self.after(0, lambda: on_results(results))
 
         thread = threading.Thread(target=do_lookup, daemon=True)
         thread.start()
 
+    def lookup_part_async(self, barcode: str, add_to_inventory: bool = True):
+        """Lookup part info asynchronously"""
+        self.run_lookup(barcode, lambda results: self.show_lookup_results(barcode, results, add_to_inventory))
+
     def show_lookup_results(self, barcode: str, results: List[Dict], add_to_inventory: bool = True):
         """Show lookup results and allow user to apply"""
         if not results:
@@ -870,6 +1504,8 @@ class InventoryScanner(tk.Tk):
         button_frame.pack(pady=10)
 
         def do_alternate_lookup():
+            if part_entry.instate(['disabled']):
+                return  # A lookup is already running
             part_num = part_var.get().strip()
             if not part_num:
                 status_label.config(text="Please enter a part number")
@@ -880,40 +1516,38 @@ class InventoryScanner(tk.Tk):
                 attempted_parts.append(part_num)
 
             status_label.config(text=f"Looking up {part_num}...")
-            dialog.update()
+            part_entry.state(['disabled'])
 
-            # Lookup the alternate part number
-            results = PartLookup.lookup_all(part_num)
+            def show_results(results):
+                if not dialog.winfo_exists():
+                    return  # Closed while the lookup ran
+                part_entry.state(['!disabled'])
+                if results:
+                    dialog.destroy()
+                    # Show results with original UPC as the key to store
+                    self.show_lookup_results_for_upc(original_upc, part_num, results, add_to_inventory)
+                else:
+                    status_label.config(text=f"No results for '{part_num}' - try another or Save Anyway")
+                    part_var.set("")
+                    part_entry.focus()
 
-            if results:
-                dialog.destroy()
-                # Show results with original UPC as the key to store
-                self.show_lookup_results_for_upc(original_upc, part_num, results, add_to_inventory)
-            else:
-                status_label.config(text=f"No results for '{part_num}' - try another or Save Anyway")
-                part_var.set("")
-                part_entry.focus()
+            # Lookup the alternate part number without blocking the dialog
+            self.run_lookup(part_num, show_results)
 
         def save_anyway():
             """Save with 'Not Identified' and store attempted part numbers"""
             dialog.destroy()
             if add_to_inventory and attempted_parts:
-                cursor = self.db.conn.cursor()
-                cursor.execute(
-                    'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?',
-                    ("Not Identified", datetime.now().isoformat(), original_upc)
-                )
-
                 additional_info = {
                     'source': 'Not Found',
                     'attempted_parts': ' | '.join(attempted_parts),
                 }
-                self.db.update_item_info(original_upc, additional_info)
+                self.db.save_item_identification(original_upc, "Not Identified", additional_info)
                 self.refresh_inventory()
                 self.status_var.set(f"Saved: Not Identified ({', '.join(attempted_parts)})")
             else:
                 self.status_var.set(f"Scanned: {original_upc} - Not Identified")
-            self.after(3000, lambda: self.status_var.set(""))
+            self.clear_status_later(3000)
 
         def manual_entry():
             dialog.destroy()
@@ -922,7 +1556,7 @@ class InventoryScanner(tk.Tk):
         def skip():
             dialog.destroy()
             self.status_var.set(f"Scanned: {original_upc} - No description")
-            self.after(2000, lambda: self.status_var.set(""))
+            self.clear_status_later()
 
         # Bind Enter key to lookup
         part_entry.bind('<Return>', lambda e: do_alternate_lookup())
@@ -1055,13 +1689,7 @@ class InventoryScanner(tk.Tk):
                 return
 
             if add_to_inventory:
-                cursor = self.db.conn.cursor()
-                cursor.execute(
-                    'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?',
-                    (desc[:200], datetime.now().isoformat(), original_upc)
-                )
-
-                # Save additional info
+                # Save description and additional info together
                 additional_info = {
                     'source': 'Web Search',
                     'search_term': search_var.get().strip(),
@@ -1069,12 +1697,12 @@ class InventoryScanner(tk.Tk):
                 if attempted_parts:
                     additional_info['attempted_parts'] = ' | '.join(attempted_parts)
 
-                self.db.update_item_info(original_upc, additional_info)
+                self.db.save_item_identification(original_upc, desc[:200], additional_info)
                 self.refresh_inventory()
 
             self.status_var.set(f"Saved: {desc[:50]}...")
             dialog.destroy()
-            self.after(2000, lambda: self.status_var.set(""))
+            self.clear_status_later()
 
         def back_to_lookup():
             dialog.destroy()
@@ -1133,12 +1761,6 @@ class InventoryScanner(tk.Tk):
                 return
 
             if add_to_inventory:
-                cursor = self.db.conn.cursor()
-                cursor.execute(
-                    'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?',
-                    (desc, datetime.now().isoformat(), upc)
-                )
-
                 additional_info = {'source': 'Manual Entry'}
                 if part_var.get().strip():
                     additional_info['part_number'] = part_var.get().strip()
@@ -1147,12 +1769,12 @@ class InventoryScanner(tk.Tk):
                 if attempted_parts:
                     additional_info['attempted_parts'] = ' | '.join(attempted_parts)
 
-                self.db.update_item_info(upc, additional_info)
+                self.db.save_item_identification(upc, desc, additional_info)
                 self.refresh_inventory()
 
             self.status_var.set(f"Saved: {desc[:50]}...")
             dialog.destroy()
-            self.after(2000, lambda: self.status_var.set(""))
+            self.clear_status_later()
 
         ttk.Button(dialog, text="Save", command=save_manual).pack(pady=15)
 
@@ -1246,14 +1868,8 @@ class InventoryScanner(tk.Tk):
                 description = ' - '.join(desc_parts) if desc_parts else result.get('title', '')
 
                 if add_to_inventory:
-                    # Update item description in database - use ORIGINAL UPC as key
-                    cursor = self.db.conn.cursor()
-                    cursor.execute(
-                        'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?',
-                        (description[:200], datetime.now().isoformat(), original_upc)
-                    )
-
-                    # Store additional info including the searched part number
+                    # Store description and additional info including the
+                    # searched part number - use ORIGINAL UPC as key
                     additional_info = {
                         'source': result['source'],
                         'searched_part': searched_part,
@@ -1266,7 +1882,7 @@ class InventoryScanner(tk.Tk):
                     if result.get('warranty'):
                         additional_info['warranty'] = result['warranty']
 
-                    self.db.update_item_info(original_upc, additional_info)
+                    self.db.save_item_identification(original_upc, description[:200], additional_info)
                     self.refresh_inventory()
                     self.status_var.set(f"Applied: {description[:50]}...")
                 else:
@@ -1274,12 +1890,12 @@ class InventoryScanner(tk.Tk):
                     self.status_var.set(f"Found: {description[:60]}...")
 
                 dialog.destroy()
-                self.after(3000, lambda: self.status_var.set(""))
+                self.clear_status_later(3000)
 
         def skip_result():
             dialog.destroy()
             self.status_var.set(f"Scanned: {original_upc}")
-            self.after(2000, lambda: self.status_var.set(""))
+            self.clear_status_later()
 
         ttk.Button(button_frame, text="Apply Selected", command=apply_result).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Skip", command=skip_result).pack(side=tk.LEFT, padx=10)
@@ -1289,30 +1905,103 @@ class InventoryScanner(tk.Tk):
         if not self.current_location_id:
             return
 
-        # Clear tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Load inventory
-        inventory = self.db.get_inventory_by_location(self.current_location_id)
-
-        for item in inventory:
-            last_scan = datetime.fromisoformat(item['last_scanned']).strftime('%Y-%m-%d %H:%M')
-            # Extract additional info
-            add_info = item.get('additional_info', {}) or {}
-            part_num = add_info.get('part_number', '') or add_info.get('searched_part', '')
-            brand = add_info.get('brand', '')
-            attempted = add_info.get('attempted_parts', '')
-
-            self.tree.insert('', 'end', values=(
-                item['upc'],
-                item['description'] or 'No description',
-                part_num,
-                brand,
-                attempted,
-                item['quantity'],
-                last_scan
-            ))
+        # Clear tree in one call rather than one delete per row
+        self.tree.delete(*self.tree.get_children())
+
+        # Load the first page; more are fetched as the list is scrolled
+        self._inventory_exhausted = False
+        self.load_more_inventory()
+
+    def load_more_inventory(self):
+        """Append the next page of the current location's inventory to the tree"""
+        if not self.current_location_id or self._inventory_exhausted:
+            return
+
+        # Rows are keyed by UPC so single items can be updated later. Rows added
+        # by scans since the last page sit above it, so the tree size is the offset
+        shown = set(self.tree.get_children())
+        inventory = self.db.get_inventory_by_location(
+            self.current_location_id, limit=self.INVENTORY_PAGE_SIZE,
+            offset=len(shown), search=self.search_var.get().strip())
+        self._inventory_exhausted = len(inventory) < self.INVENTORY_PAGE_SIZE
+
+        # Build all rows first, then insert them in a tight loop; Tk redraws
+        # once when the event loop goes idle
+        rows = [(item['upc'], self._inventory_row_values(item))
+                for item in inventory if item['upc'] not in shown]
+        insert = self.tree.insert
+        for upc, values in rows:
+            insert('', 'end', iid=upc, values=values)
+
+    def _on_inventory_scroll(self, first, last):
+        """Keep the scrollbar in sync and load the next page near the bottom"""
+        self.inventory_scrollbar.set(first, last)
+        if float(first) > 0 and float(last) > 0.9 and not self._inventory_exhausted:
+            self.after_idle(self.load_more_inventory)
+
+    def _on_search_changed(self, *args):
+        """Reload the inventory shortly after the search text stops changing"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(300, self._apply_search)
+
+    def _apply_search(self):
+        """Show the inventory matching the current search text"""
+        self._search_after_id = None
+        self.refresh_inventory()
+
+    def _on_scans_committed(self, upcs: List[str]):
+        """Have the UI thread redraw the rows of a batch of scans just committed"""
+        try:
+            self.after(0, lambda: self._refresh_committed_rows(upcs))
+        except (RuntimeError, tk.TclError):
+            pass  # The window is already gone
+
+    def _refresh_committed_rows(self, upcs: List[str]):
+        """Redraw the rows of committed scans, oldest first so the newest ends on top"""
+        for upc in upcs:
+            self.refresh_inventory_row(upc)
+
+    def refresh_inventory_row(self, upc: str):
+        """Update the display of one just-scanned item instead of reloading the tree"""
+        if not self.current_location_id:
+            return
+
+        item = self.db.get_inventory_item(upc, self.current_location_id)
+        if item is None:
+            return
+
+        # Leave items that don't match the active search out of the list
+        search = self.search_var.get().strip().lower()
+        if search and search not in item['upc'].lower() and search not in (item['description'] or '').lower():
+            return
+
+        # Newest scan goes first, matching the full refresh order
+        values = self._inventory_row_values(item)
+        if self.tree.exists(upc):
+            self.tree.item(upc, values=values)
+            self.tree.move(upc, '', 0)
+        else:
+            self.tree.insert('', 0, iid=upc, values=values)
+
+    @staticmethod
+    def _inventory_row_values(item: Dict) -> tuple:
+        """Build the treeview values for an inventory item"""
+        # Extract additional info
+        add_info = item.get('additional_info', {}) or {}
+        part_num = add_info.get('part_number', '') or add_info.get('searched_part', '')
+        brand = add_info.get('brand', '')
+        attempted = add_info.get('attempted_parts', '')
+
+        return (
+            item['upc'],
+            item['description'] or 'No description',
+            part_num,
+            brand,
+            attempted,
+            item['quantity'],
+            item['last_scanned_fmt']
+        )
     
     def add_location_dialog(self):
         """Show dialog to add a new location"""
@@ -1357,18 +2046,16 @@ class InventoryScanner(tk.Tk):
             messagebox.showinfo("Info", "Please select an item from the inventory")
             return
         
-        item_values = self.tree.item(selected[0])['values']
-        upc = item_values[0]
+        # Rows are keyed by UPC; the displayed value may have lost leading zeros
+        upc = selected[0]
         
         dialog = tk.Toplevel(self)
         dialog.title(f"Add Info for UPC: {upc}")
         dialog.geometry("500x400")
         
         # Get current item info
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM items WHERE upc = ?', (upc,))
-        item = dict(cursor.fetchone())
-        current_info = json.loads(item['additional_info']) if item['additional_info'] else {}
+        item = self.db.get_item(upc)
+        current_info = item['additional_info']
         
         # Description field
         ttk.Label(dialog, text="Description:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
@@ -1403,12 +2090,6 @@ class InventoryScanner(tk.Tk):
         ttk.Entry(fields_frame, textvariable=new_value_var, width=30).grid(row=row+1, column=1, padx=5, pady=2)
         
         def save_info():
-            # Update description
-            self.db.conn.cursor().execute(
-                'UPDATE items SET description = ?, updated_at = ? WHERE upc = ?',
-                (desc_var.get(), datetime.now().isoformat(), upc)
-            )
-            
             # Collect all additional info
             additional_info = {}
             for key, var in field_entries.items():
@@ -1419,8 +2100,8 @@ class InventoryScanner(tk.Tk):
             if new_key_var.get().strip() and new_value_var.get().strip():
                 additional_info[new_key_var.get().strip()] = new_value_var.get().strip()
             
-            # Update additional info
-            self.db.update_item_info(upc, additional_info)
+            # Update description and additional info
+            self.db.save_item_identification(upc, desc_var.get(), additional_info)
             self.refresh_inventory()
             dialog.destroy()
         
@@ -1448,17 +2129,44 @@ class InventoryScanner(tk.Tk):
         tree.heading('Total Quantity', text='Total Quantity')
         
         # Get summary data
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT l.name, COUNT(DISTINCT inv.item_upc) as item_count, SUM(inv.quantity) as total_qty
-            FROM locations l
-            LEFT JOIN inventory inv ON l.id = inv.location_id
-            GROUP BY l.id, l.name
-            ORDER BY l.name
-        ''')
+        for row in self.db.get_location_summary():
+            tree.insert('', 'end', values=(row['name'], row['item_count'], row['total_qty']))
+    
+    def run_sync_task(self, task, status: str, on_done, error_title: str, error_text: str,
+                      on_failed=None, open_sync: bool = True) -> threading.Thread:
+        """Run task(sync) on a worker thread, then on_done or an error box (and on_failed) on the UI thread
+
+        With open_sync=False the task doesn't need this station's database and gets None.
+        """
+        self.db.flush()
+        self.status_var.set(status)
         
-        for row in cursor.fetchall():
-            tree.insert('', 'end', values=(row['name'], row['item_count'] or 0, row['total_qty'] or 0))
+        def worker():
+            # The worker opens its own InventorySync; connections stay on their thread
+            try:
+                sync = InventorySync(self.db.db_path) if open_sync else None
+                try:
+                    task(sync)
+                finally:
+                    if sync is not None:
+                        sync.close()
+            except Exception as e:
+                message = f"{error_text}:\n{str(e)}"
+                self.after(0, lambda: self._sync_task_finished(on_failed, error=(error_title, message)))
+            else:
+                self.after(0, lambda: self._sync_task_finished(on_done))
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+    
+    def _sync_task_finished(self, callback=None, error=None):
+        """Report the outcome of a run_sync_task on the UI thread"""
+        self.status_var.set("")
+        if error is not None:
+            messagebox.showerror(*error)
+        if callback is not None:
+            callback()
     
     def export_data_dialog(self):
         """Show dialog for exporting data"""
@@ -1497,16 +2205,13 @@ class InventoryScanner(tk.Tk):
                 messagebox.showerror("Error", "Please select an export directory")
                 return
             
-            try:
-                sync = InventorySync(self.db.db_path)
-                since_date = date_var.get() if filter_var.get() else None
-                sync.export_data(export_path, since_date)
-                sync.close()
-                
-                messagebox.showinfo("Success", f"Data exported successfully to:\n{export_path}")
-                dialog.destroy()
-            except Exception as e:
-                messagebox.showerror("Export Error", f"Failed to export data:\n{str(e)}")
+            since_date = date_var.get() if filter_var.get() else None
+            dialog.destroy()
+            self.run_sync_task(
+                lambda sync: sync.export_data(export_path, since_date),
+                f"Exporting to {export_path}...",
+                lambda: messagebox.showinfo("Success", f"Data exported successfully to:\n{export_path}"),
+                "Export Error", "Failed to export data")
         
         ttk.Button(dialog, text="Export", command=export_data).grid(row=3, column=0, columnspan=3, pady=20)
     
@@ -1555,9 +2260,8 @@ class InventoryScanner(tk.Tk):
             if messagebox.askyesno("Confirm Import", 
                                   "Are you sure you want to import data?\nThis will modify your database."):
                 try:
-                    sync = InventorySync(self.db.db_path)
-                    sync.import_data(import_path, merge_var.get())
-                    sync.close()
+                    self.db.flush()
+                    self.sync.import_data(import_path, merge_var.get())
                     
                     self.refresh_inventory()
                     messagebox.showinfo("Success", "Data imported successfully!")
@@ -1604,25 +2308,24 @@ class InventoryScanner(tk.Tk):
                 messagebox.showerror("Error", "Please specify an output file")
                 return
             
-            try:
-                sync = InventorySync(self.db.db_path)
-                sync.generate_report(output_file)
-                sync.close()
-                
+            open_report = open_var.get()
+            dialog.destroy()
+            
+            def report_done():
                 messagebox.showinfo("Success", f"Report generated successfully:\n{output_file}")
                 
-                if open_var.get():
+                if open_report:
                     # Open the report file
                     if platform.system() == "Windows":
                         os.startfile(output_file)
                     elif platform.system() == "Darwin":  # macOS
-                        subprocess.run(["open", output_file])
+                        subprocess.Popen(["open", output_file])
                     else:  # Linux
-                        subprocess.run(["xdg-open", output_file])
-                
-                dialog.destroy()
-            except Exception as e:
-                messagebox.showerror("Report Error", f"Failed to generate report:\n{str(e)}")
+                        subprocess.Popen(["xdg-open", output_file])
+            
+            self.run_sync_task(lambda sync: sync.generate_report(output_file),
+                               "Generating report...", report_done,
+                               "Report Error", "Failed to generate report")
         
         ttk.Button(dialog, text="Generate Report", command=generate_report).grid(row=2, column=0, columnspan=3, pady=20)
     
@@ -1655,10 +2358,19 @@ class InventoryScanner(tk.Tk):
         
         def add_directory():
             directory = filedialog.askdirectory(initialdir=Path.home())
-            if directory and Path(directory, 'metadata.json').exists():
-                source_list.insert(tk.END, directory)
-            elif directory:
+            if not directory:
+                return
+            # Either an export directory or a folder of exports. Only its
+            # immediate subfolders are searched: this runs on the UI thread,
+            # and walking a home folder or a whole drive could take minutes
+            export_dirs = InventorySync.find_export_dirs(directory, max_depth=1)
+            if not export_dirs:
                 messagebox.showerror("Error", "Invalid export directory. No metadata.json found.")
+                return
+            listed = {os.path.realpath(d) for d in source_list.get(0, tk.END)}
+            for export_dir in export_dirs:
+                if os.path.realpath(export_dir) not in listed:
+                    source_list.insert(tk.END, export_dir)
         
         def remove_directory():
             selection = source_list.curselection()
@@ -1686,30 +2398,69 @@ class InventoryScanner(tk.Tk):
         
         ttk.Button(dialog, text="Browse", command=browse_output).grid(row=3, column=2, padx=5)
         
+        # Shown while the build runs on a worker thread
+        progress = ttk.Progressbar(dialog, mode='indeterminate')
+        cancel = threading.Event()
+        
         def create_master():
-            source_dirs = list(source_list.get(0, tk.END))
+            # Read the dialog fields once; the worker gets plain values
+            source_dirs = source_list.get(0, tk.END)
+            output_db = output_var.get().strip()
+            
             if not source_dirs:
                 messagebox.showerror("Error", "Please add at least one source directory")
                 return
             
-            output_db = output_var.get()
+            missing = [d for d in source_dirs if not os.path.isdir(d)]
+            if missing:
+                messagebox.showerror("Error", "These source directories no longer exist:\n" + "\n".join(missing))
+                return
+            
             if not output_db:
                 messagebox.showerror("Error", "Please specify an output database file")
                 return
+            # The build takes the file over exclusively and drops its indexes
+            output_db = os.path.abspath(output_db)
+            if os.path.realpath(output_db) == os.path.realpath(self.db.db_path):
+                messagebox.showerror("Error", "The master database can't be this station's own database")
+                return
             
-            try:
-                sync = InventorySync()
-                sync.create_master_db(source_dirs, output_db)
-                sync.close()
-                
-                messagebox.showinfo("Success", f"Master database created successfully:\n{output_db}")
+            cancel.clear()
+            create_button.configure(state=tk.DISABLED)
+            cancel_button.configure(state=tk.NORMAL)
+            progress.grid(row=5, column=0, columnspan=3, padx=10, pady=(0, 10), sticky=(tk.W, tk.E))
+            progress.start(10)
+            
+            def master_failed():
+                self._master_task = None
+                if dialog.winfo_exists():
+                    progress.stop()
+                    progress.grid_remove()
+                    create_button.configure(state=tk.NORMAL)
+                    cancel_button.configure(state=tk.DISABLED)
+            
+            def master_done():
+                self._master_task = None
                 dialog.destroy()
-            except Exception as e:
-                messagebox.showerror("Master DB Error", f"Failed to create master database:\n{str(e)}")
-        
-        ttk.Button(dialog, text="Create Master Database", command=create_master).grid(
-            row=4, column=0, columnspan=3, pady=20
-        )
+                if cancel.is_set():
+                    messagebox.showinfo("Cancelled", f"Master database creation was cancelled:\n{output_db}")
+                else:
+                    messagebox.showinfo("Success", f"Master database created successfully:\n{output_db}")
+            
+            thread = self.run_sync_task(
+                lambda _: InventorySync.create_master_db(source_dirs, output_db, cancel),
+                "Creating master database...", master_done,
+                "Master DB Error", "Failed to create master database",
+                on_failed=master_failed, open_sync=False)
+            self._master_task = (thread, cancel)
+        
+        action_frame = ttk.Frame(dialog)
+        action_frame.grid(row=4, column=0, columnspan=3, pady=20)
+        create_button = ttk.Button(action_frame, text="Create Master Database", command=create_master)
+        create_button.pack(side=tk.LEFT, padx=5)
+        # Stops after the source directory being imported
+        cancel_button = ttk.Button(action_frame, text="Cancel", command=cancel.set, state=tk.DISABLED)
+        cancel_button.pack(side=tk.LEFT, padx=5)
         
         # Configure grid weights
         dialog.columnconfigure(1, weight=1)
@@ -1822,11 +2573,16 @@ class InventoryScanner(tk.Tk):
                     f"Test code: {test_code}\n\n"
                     f"No results returned. Check API configuration.")
 
+        def clear_lookup_cache():
+            PartLookup.clear_cache()
+            messagebox.showinfo("Lookup Cache", "Cached lookup results cleared")
+
         ttk.Button(btn_frame, text="Add API", command=add_api).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Edit", command=edit_api).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Delete", command=delete_api).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Enable/Disable", command=toggle_api).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Test", command=test_api).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Clear Cache", command=clear_lookup_cache).pack(side=tk.LEFT, padx=5)
 
         # Double-click to edit
         api_tree.bind('<Double-1>', lambda e: edit_api())
@@ -1929,6 +2685,20 @@ Type Guide:
 
     def on_closing(self):
         """Handle window closing"""
+        # Let a master database build stop after its current source directory
+        if self._master_task is not None:
+            thread, cancel = self._master_task
+            cancel.set()
+            # Keep handling events: the worker reports back through after()
+            while thread.is_alive():
+                self.update()
+                thread.join(0.05)
+        # The scan writer reports commits through after() too
+        writer = self.db.stop_writer()
+        while writer.is_alive():
+            self.update()
+            writer.join(0.05)
+        self.db.flush()
         self.db.close()
         self.destroy()
 
@@ -7,19 +7,58 @@ Handles export/import of inventory data for multi-workstation setups
 import sqlite3
 import json
 import os
+import platform
 from datetime import datetime
 from pathlib import Path
 import shutil
 import argparse
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+
+# Files written by export_data and read back by read_export
+EXPORT_FILES = ('metadata', 'locations', 'items', 'inventory', 'scan_history')
+
+# Exports read ahead by create_master_db while the current one is written
+READ_AHEAD = 4
+
+# Directories listed at once by find_export_dirs; also caps its open handles
+SCAN_WORKERS = 8
 
 
 class InventorySync:
     """Handles syncing inventory data between workstations"""
     
-    def __init__(self, db_path: str = "inventory.db"):
+    # Folder names find_export_dirs skips unless given its own list
+    SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__', '.venv', '.Trash',
+                           '$RECYCLE.BIN', 'System Volume Information'})
+    
+    def __init__(self, db_path: str = "inventory.db", conn: sqlite3.Connection = None, lock=None):
         self.db_path = db_path
+        # Writes hold the lock; pass the scanner's connection and write lock
+        # to import through it instead of opening a second connection
+        self.lock = lock if lock is not None else threading.RLock()
+        self.owns_conn = conn is None
+        if conn is not None:
+            self.conn = conn
+            return
+        
         self.conn = sqlite3.connect(db_path)
         self.conn.row_factory = sqlite3.Row
+        # Replace-mode imports must fire the location_summary delete trigger
+        self.conn.execute("PRAGMA recursive_triggers=ON")
+        
+        # Databases from before integer location ids or item_attributes need
+        # the scanner's migration
+        columns = [row['name'] for row in self.conn.execute('PRAGMA table_info(locations)')]
+        has_attributes = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_attributes'").fetchone()
+        if columns and ('uuid' not in columns or not has_attributes):
+            from inventory_scanner import InventoryDatabase
+            InventoryDatabase(db_path).close()
     
     def export_data(self, export_path: str, since_date: str = None) -> None:
         """Export inventory data to JSON files"""
@@ -29,55 +68,58 @@ class InventorySync:
         # Export metadata
         metadata = {
             'export_date': datetime.now().isoformat(),
-            'workstation': os.environ.get('COMPUTERNAME', 'unknown'),
+            'workstation': os.environ.get('COMPUTERNAME') or platform.node() or 'unknown',
             'since_date': since_date
         }
         
         with open(export_dir / 'metadata.json', 'w') as f:
             json.dump(metadata, f, indent=2)
         
-        # Export locations
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM locations')
-        locations = [dict(row) for row in cursor.fetchall()]
-        
-        with open(export_dir / 'locations.json', 'w') as f:
-            json.dump(locations, f, indent=2)
-        
-        # Export items
-        cursor.execute('SELECT * FROM items')
-        items = [dict(row) for row in cursor.fetchall()]
-        
-        with open(export_dir / 'items.json', 'w') as f:
-            json.dump(items, f, indent=2)
-        
-        # Export inventory with optional date filter
+        # Export inventory and scan history with an optional date filter
+        inventory_query = '''
+            SELECT inv.id, inv.item_upc, l.uuid AS location_id, inv.quantity, inv.last_scanned
+            FROM inventory inv
+            JOIN locations l ON l.id = inv.location_id
+        '''
+        history_query = '''
+            SELECT h.id, h.item_upc, l.uuid AS location_id, h.action, h.quantity_change,
+                   h.scanned_at, h.workstation_id
+            FROM scan_history h
+            JOIN locations l ON l.id = h.location_id
+        '''
         if since_date:
-            cursor.execute('''
-                SELECT * FROM inventory 
-                WHERE last_scanned >= ?
-            ''', (since_date,))
-        else:
-            cursor.execute('SELECT * FROM inventory')
-        
-        inventory = [dict(row) for row in cursor.fetchall()]
-        
-        with open(export_dir / 'inventory.json', 'w') as f:
-            json.dump(inventory, f, indent=2)
-        
-        # Export scan history with optional date filter
-        if since_date:
-            cursor.execute('''
-                SELECT * FROM scan_history 
-                WHERE scanned_at >= ?
-            ''', (since_date,))
-        else:
-            cursor.execute('SELECT * FROM scan_history')
+            inventory_query += ' WHERE inv.last_scanned >= ?'
+            history_query += ' WHERE h.scanned_at >= ?'
+        params = (since_date,) if since_date else ()
         
-        scan_history = [dict(row) for row in cursor.fetchall()]
+        # All reads in one transaction, so they see a single snapshot even
+        # while the scanner keeps committing scans
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN')
+        try:
+            # Locations are identified by their uuid in exports; the integer ids
+            # are local to each database
+            cursor.execute('SELECT uuid AS id, name, description, created_at FROM locations')
+            locations = [dict(row) for row in cursor.fetchall()]
+            
+            cursor.execute('SELECT * FROM items')
+            items = [dict(row) for row in cursor.fetchall()]
+            
+            cursor.execute(inventory_query, params)
+            inventory = [dict(row) for row in cursor.fetchall()]
+            
+            cursor.execute(history_query, params)
+            scan_history = [dict(row) for row in cursor.fetchall()]
+            
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
         
-        with open(export_dir / 'scan_history.json', 'w') as f:
-            json.dump(scan_history, f, indent=2)
+        for name, rows in (('locations', locations), ('items', items),
+                           ('inventory', inventory), ('scan_history', scan_history)):
+            with open(export_dir / f'{name}.json', 'w') as f:
+                json.dump(rows, f, indent=2)
         
         print(f"Data exported to {export_dir}")
         print(f"- Locations: {len(locations)}")
@@ -87,106 +129,127 @@ class InventorySync:
     
     def import_data(self, import_path: str, merge: bool = True) -> None:
         """Import inventory data from JSON files"""
+        self.write_export(self.read_export(import_path), merge)
+    
+    @staticmethod
+    def read_export(import_path: str) -> Dict[str, list]:
+        """Load the JSON files of an export directory, keyed by file name without .json"""
         import_dir = Path(import_path)
         
         if not import_dir.exists():
             raise ValueError(f"Import directory {import_dir} does not exist")
         
-        # Read metadata
-        with open(import_dir / 'metadata.json', 'r') as f:
-            metadata = json.load(f)
+        export = {}
+        for name in EXPORT_FILES:
+            with open(import_dir / f'{name}.json', 'r') as f:
+                export[name] = json.load(f)
+        return export
+    
+    def write_export(self, export: Dict[str, list], merge: bool = True) -> None:
+        """Write an export loaded by read_export into the database"""
+        metadata = export['metadata']
+        locations = export['locations']
+        items = export['items']
+        inventory = export['inventory']
+        scan_history = export['scan_history']
         
         print(f"Importing data from {metadata['workstation']} exported on {metadata['export_date']}")
         
-        # Import locations
-        with open(import_dir / 'locations.json', 'r') as f:
-            locations = json.load(f)
-        
-        cursor = self.conn.cursor()
-        for loc in locations:
-            if merge:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO locations (id, name, description, created_at)
-                    VALUES (?, ?, ?, ?)
-                ''', (loc['id'], loc['name'], loc['description'], loc['created_at']))
-            else:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO locations (id, name, description, created_at)
-                    VALUES (?, ?, ?, ?)
-                ''', (loc['id'], loc['name'], loc['description'], loc['created_at']))
-        
-        # Import items
-        with open(import_dir / 'items.json', 'r') as f:
-            items = json.load(f)
-        
-        for item in items:
-            if merge:
-                # Merge: only update if newer
-                cursor.execute('''
-                    INSERT INTO items (upc, description, additional_info, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                    ON CONFLICT(upc) DO UPDATE SET
-                        description = CASE 
-                            WHEN excluded.updated_at > items.updated_at 
-                            THEN excluded.description 
-                            ELSE items.description 
-                        END,
-                        additional_info = CASE 
-                            WHEN excluded.updated_at > items.updated_at 
-                            THEN excluded.additional_info 
-                            ELSE items.additional_info 
-                        END,
-                        updated_at = CASE 
-                            WHEN excluded.updated_at > items.updated_at 
-                            THEN excluded.updated_at 
-                            ELSE items.updated_at 
-                        END
-                ''', (item['upc'], item['description'], item['additional_info'], 
-                      item['created_at'], item['updated_at']))
-            else:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO items (upc, description, additional_info, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (item['upc'], item['description'], item['additional_info'], 
-                      item['created_at'], item['updated_at']))
-        
-        # Import inventory
-        with open(import_dir / 'inventory.json', 'r') as f:
-            inventory = json.load(f)
-        
-        for inv in inventory:
-            if merge:
-                # For merge, add quantities
-                cursor.execute('''
-                    INSERT INTO inventory (item_upc, location_id, quantity, last_scanned)
-                    VALUES (?, ?, ?, ?)
-                    ON CONFLICT(item_upc, location_id) DO UPDATE SET
-                        quantity = inventory.quantity + excluded.quantity,
-                        last_scanned = CASE 
-                            WHEN excluded.last_scanned > inventory.last_scanned 
-                            THEN excluded.last_scanned 
-                            ELSE inventory.last_scanned 
-                        END
-                ''', (inv['item_upc'], inv['location_id'], inv['quantity'], inv['last_scanned']))
-            else:
-                # Replace mode
-                cursor.execute('''
-                    INSERT OR REPLACE INTO inventory (item_upc, location_id, quantity, last_scanned)
-                    VALUES (?, ?, ?, ?)
-                ''', (inv['item_upc'], inv['location_id'], inv['quantity'], inv['last_scanned']))
-        
-        # Import scan history
-        with open(import_dir / 'scan_history.json', 'r') as f:
-            scan_history = json.load(f)
-        
-        for scan in scan_history:
-            cursor.execute('''
-                INSERT INTO scan_history (item_upc, location_id, action, quantity_change, scanned_at, workstation_id)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (scan['item_upc'], scan['location_id'], scan['action'], 
-                  scan['quantity_change'], scan['scanned_at'], scan['workstation_id']))
-        
-        self.conn.commit()
+        # All writes go in one transaction, committed or rolled back as a whole
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                # Import locations. Exported location ids are uuids; map each to
+                # the local integer id, falling back to a local location of the same name
+                location_ids = {}
+                for loc in locations:
+                    cursor.execute('''
+                        INSERT OR IGNORE INTO locations (uuid, name, description, created_at)
+                        VALUES (?, ?, ?, ?)
+                    ''', (loc['id'], loc['name'], loc['description'], loc['created_at']))
+                    if not merge:
+                        cursor.execute('''
+                            UPDATE OR IGNORE locations SET name = ?, description = ?, created_at = ?
+                            WHERE uuid = ?
+                        ''', (loc['name'], loc['description'], loc['created_at'], loc['id']))
+                    cursor.execute('SELECT id FROM locations WHERE uuid = ?', (loc['id'],))
+                    row = cursor.fetchone()
+                    if row is None:
+                        cursor.execute('SELECT id FROM locations WHERE name = ?', (loc['name'],))
+                        row = cursor.fetchone()
+                    location_ids[loc['id']] = row['id']
+                
+                # Import items. Rows are fed to executemany as generators so
+                # no second copy of a large export is built in memory
+                item_rows = ((item['upc'], item['description'], item['additional_info'],
+                              item['created_at'], item['updated_at']) for item in items)
+                if merge:
+                    # Merge: only update if newer
+                    cursor.executemany('''
+                        INSERT INTO items (upc, description, additional_info, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(upc) DO UPDATE SET
+                            description = CASE 
+                                WHEN excluded.updated_at > items.updated_at 
+                                THEN excluded.description 
+                                ELSE items.description 
+                            END,
+                            additional_info = CASE 
+                                WHEN excluded.updated_at > items.updated_at 
+                                THEN excluded.additional_info 
+                                ELSE items.additional_info 
+                            END,
+                            updated_at = CASE 
+                                WHEN excluded.updated_at > items.updated_at 
+                                THEN excluded.updated_at 
+                                ELSE items.updated_at 
+                            END
+                    ''', item_rows)
+                else:
+                    cursor.executemany('''
+                        INSERT OR REPLACE INTO items (upc, description, additional_info, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', item_rows)
+                self._refresh_item_attributes(cursor, (item['upc'] for item in items))
+                
+                # Import inventory
+                # Rows whose location is missing from this export are skipped
+                inventory_rows = ((inv['item_upc'], location_ids[inv['location_id']], inv['quantity'], inv['last_scanned'])
+                                  for inv in inventory if inv['location_id'] in location_ids)
+                if merge:
+                    # For merge, add quantities
+                    cursor.executemany('''
+                        INSERT INTO inventory (item_upc, location_id, quantity, last_scanned)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(item_upc, location_id) DO UPDATE SET
+                            quantity = inventory.quantity + excluded.quantity,
+                            last_scanned = CASE 
+                                WHEN excluded.last_scanned > inventory.last_scanned 
+                                THEN excluded.last_scanned 
+                                ELSE inventory.last_scanned 
+                            END
+                    ''', inventory_rows)
+                else:
+                    # Replace mode
+                    cursor.executemany('''
+                        INSERT OR REPLACE INTO inventory (item_upc, location_id, quantity, last_scanned)
+                        VALUES (?, ?, ?, ?)
+                    ''', inventory_rows)
+                
+                # Import scan history
+                cursor.executemany('''
+                    INSERT INTO scan_history (item_upc, location_id, action, quantity_change, scanned_at, workstation_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', ((scan['item_upc'], location_ids[scan['location_id']], scan['action'],
+                       scan['quantity_change'], scan['scanned_at'], scan['workstation_id'])
+                      for scan in scan_history if scan['location_id'] in location_ids))
+                
+                # Inside the try, so a failed commit is rolled back as well
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
         
         print(f"Import completed:")
         print(f"- Locations: {len(locations)}")
@@ -194,31 +257,146 @@ class InventorySync:
         print(f"- Inventory entries: {len(inventory)}")
         print(f"- Scan history: {len(scan_history)}")
     
-    def create_master_db(self, source_dirs: list, output_db: str) -> None:
-        """Create a master database from multiple workstation exports"""
-        # Create new master database
+    @staticmethod
+    def _refresh_item_attributes(cursor, upcs) -> None:
+        """Rewrite item_attributes for the given items from their stored additional_info"""
+        # Stage the UPCs once so the delete and the read are single statements
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS import_upcs (upc TEXT PRIMARY KEY)')
+        cursor.execute('DELETE FROM temp.import_upcs')
+        cursor.executemany('INSERT OR IGNORE INTO temp.import_upcs (upc) VALUES (?)', ((upc,) for upc in upcs))
+        
+        cursor.execute('DELETE FROM item_attributes WHERE upc IN (SELECT upc FROM temp.import_upcs)')
+        cursor.execute('''
+            SELECT i.upc, i.additional_info
+            FROM items i
+            JOIN temp.import_upcs u ON u.upc = i.upc
+            WHERE i.additional_info NOT IN ('', '{}')
+        ''')
+        rows = ((upc, key, value if isinstance(value, str) else json.dumps(value))
+                for upc, info in cursor.fetchall()
+                for key, value in json.loads(info).items())
+        cursor.executemany('INSERT INTO item_attributes (upc, key, value) VALUES (?, ?, ?)', rows)
+        cursor.execute('DELETE FROM temp.import_upcs')
+    
+    @staticmethod
+    def _scan_export_dir(directory: str, skip_dirs=frozenset()) -> tuple:
+        """List one directory: whether it holds a metadata.json, and its subdirectories"""
+        subdirs = []
+        is_export = False
+        try:
+            # DirEntry carries the file type from the directory listing,
+            # so no extra stat() per entry is needed
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            subdirs.append(entry.path)
+                    elif entry.name == 'metadata.json' and entry.is_file():
+                        is_export = True
+        except OSError:
+            pass  # Unreadable directory
+        return is_export, subdirs
+    
+    @classmethod
+    def find_export_dirs(cls, root: str, skip_dirs=None, max_depth: int = None) -> list:
+        """Find export directories (those holding a metadata.json) at or below root, skipping skip_dirs names
+
+        With max_depth, directories more than that many levels below root are not searched.
+        """
+        if skip_dirs is None:
+            skip_dirs = cls.SKIP_DIRS
+        found = []
+        level = [root]
+        depth = 0
+        # List each level of the tree on a few threads so slow (network)
+        # drives overlap their round trips; at most SCAN_WORKERS are open at once
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            while level:
+                next_level = []
+                for directory, (is_export, subdirs) in zip(level, pool.map(lambda d: cls._scan_export_dir(d, skip_dirs), level)):
+                    if is_export:
+                        found.append(directory)  # Exports don't contain other exports
+                    else:
+                        next_level.extend(subdirs)
+                depth += 1
+                level = next_level if max_depth is None or depth <= max_depth else []
+        return sorted(found)
+    
+    @classmethod
+    def create_master_db(cls, source_dirs: list, output_db: str, cancel: threading.Event = None) -> None:
+        """Create a master database from multiple workstation exports; stops early once cancel is set"""
+        # Merging adds quantities, so an export listed twice (or through a
+        # symlink) must only be imported once
+        source_dirs = list(dict.fromkeys(os.path.realpath(d) for d in source_dirs))
+        
+        # Create new master database. The old one is backed up and replaced
+        # rather than merged into, which would add its quantities again
         if os.path.exists(output_db):
             backup_name = f"{output_db}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             shutil.copy(output_db, backup_name)
             print(f"Backed up existing database to {backup_name}")
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(output_db + suffix):
+                    os.remove(output_db + suffix)
+        
+        # Large pages mean fewer B-tree pages to write for a bulk load. The page
+        # size only takes effect before the first table is created (and before
+        # WAL mode is turned on), so the empty file is written with it first
+        empty_db = sqlite3.connect(output_db)
+        empty_db.execute('PRAGMA page_size=65536')
+        empty_db.execute('VACUUM')
+        empty_db.close()
         
         # Initialize new database
         from inventory_scanner import InventoryDatabase
         master_db = InventoryDatabase(output_db)
         master_db.close()
         
-        # Create sync instance for master
-        master_sync = InventorySync(output_db)
-        
-        # Import all source directories
-        for source_dir in source_dirs:
-            print(f"\nImporting from {source_dir}...")
-            try:
-                master_sync.import_data(source_dir, merge=True)
-            except Exception as e:
-                print(f"Error importing {source_dir}: {e}")
-        
-        master_sync.close()
+        # Create sync instance for master. Nothing else uses the file while it
+        # is built, so skip fsyncs and hold the lock for the whole load
+        master_sync = cls(output_db)
+        master_conn = master_sync.conn
+        for pragma in ('synchronous=OFF', 'temp_store=MEMORY', 'cache_size=-262144', 'mmap_size=1073741824',
+                       'locking_mode=EXCLUSIVE'):
+            master_conn.execute(f'PRAGMA {pragma}')
+        
+        # Secondary indexes are built once after loading instead of being
+        # updated row by row; the unique keys the imports rely on stay
+        indexes = master_conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall()
+        for index in indexes:
+            master_conn.execute(f'DROP INDEX {index["name"]}')
+        
+        try:
+            # Import all source directories. Worker threads load the next few
+            # exports while this thread writes the current one; SQLite writes
+            # stay on this thread
+            with ThreadPoolExecutor(max_workers=READ_AHEAD) as pool:
+                remaining = iter(source_dirs)
+                reads = deque((source_dir, pool.submit(cls.read_export, source_dir))
+                              for source_dir in itertools.islice(remaining, READ_AHEAD))
+                while reads:
+                    source_dir, read = reads.popleft()
+                    for next_dir in itertools.islice(remaining, 1):
+                        reads.append((next_dir, pool.submit(cls.read_export, next_dir)))
+                    if cancel is not None and cancel.is_set():
+                        for _, pending in reads:
+                            pending.cancel()
+                        print("\nCancelled")
+                        break
+                    print(f"\nImporting from {source_dir}...")
+                    try:
+                        master_sync.write_export(read.result(), merge=True)
+                    except Exception as e:
+                        print(f"Error importing {source_dir}: {e}")
+        finally:
+            for index in indexes:
+                master_conn.execute(index['sql'])
+            master_conn.execute('ANALYZE')
+            # Make the finished database durable before handing it over
+            master_conn.execute('PRAGMA synchronous=FULL')
+            master_conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            master_sync.close()
         print(f"\nMaster database created at {output_db}")
     
     def generate_report(self, output_file: str = "inventory_report.txt") -> None:
@@ -281,8 +459,9 @@ class InventorySync:
         print(f"Report generated: {output_file}")
     
     def close(self):
-        """Close database connection"""
-        self.conn.close()
+        """Close database connection, unless it was borrowed"""
+        if self.owns_conn:
+            self.conn.close()
 
 
 def main():
@@ -325,8 +504,7 @@ def main():
         sync.close()
     
     elif args.command == 'master':
-        sync = InventorySync()
-        sync.create_master_db(args.sources, args.output)
+        InventorySync.create_master_db(args.sources, args.output)
     
     elif args.command == 'report':
         sync = InventorySync(args.db)